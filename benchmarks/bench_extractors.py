@@ -0,0 +1,95 @@
+"""Время и пик памяти разбора страницы целиком и через SoupStrainer.
+
+Для индекса PEP сравнивается обход строк таблицы в дереве BeautifulSoup
+с разбором числового индекса в словарь за один проход по дереву lxml.
+
+Запуск из корня проекта:
+    PYTHONPATH=src:. python benchmarks/bench_extractors.py
+"""
+import time
+import tracemalloc
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+from prettytable import PrettyTable
+
+from extractors import (
+    extract_pep_card, extract_pep_index, extract_whats_new, get_field
+)
+from utils import find_tag
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+PAGES_DIR = BASE_DIR / 'tests' / 'fixture_data' / 'pages'
+REPEAT = 20
+
+
+def full_pep_card(html):
+    soup = BeautifulSoup(html, 'lxml')
+    main_card_tag = find_tag(soup, 'section', {'id': 'pep-content'})
+    main_card = find_tag(
+        main_card_tag, 'dl', {'class': 'rfc2822 field-list simple'}
+    )
+    return (
+        get_field(main_card, 'Status'),
+        find_tag(main_card_tag, 'h1').text,
+        get_field(main_card, 'Author').replace('\n', ' '),
+    )
+
+
+def full_whats_new(html):
+    soup = BeautifulSoup(html, 'lxml')
+    h1 = find_tag(soup, 'h1')
+    dl = find_tag(soup, 'dl')
+    return h1.text, dl.text.replace('\n', ' ')
+
+
+def full_pep_index(html):
+    soup = BeautifulSoup(html, 'lxml')
+    main_tag = find_tag(soup, 'section', {'id': 'numerical-index'})
+    return {
+        int(pep_row.a.text): (
+            pep_row.td.text[:1], pep_row.td.text[1:], pep_row.a['href']
+        )
+        for pep_row in main_tag.find_all('tr')[1:]
+    }
+
+
+CASES = (
+    ('pep-0008.html', full_pep_card, extract_pep_card, 'SoupStrainer'),
+    ('whatsnew-3.11.html', full_whats_new, extract_whats_new, 'SoupStrainer'),
+    ('pep-index.html', full_pep_index, extract_pep_index, 'lxml, один проход'),
+)
+
+
+def measure(extractor, html):
+    timings = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        extractor(html)
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    extractor(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(timings), peak
+
+
+def main():
+    table = PrettyTable()
+    table.field_names = ('Страница', 'Разбор', 'Время, мс', 'Пик памяти, КБ')
+    table.align = 'l'
+    for page, before, after, label_after in CASES:
+        html = (PAGES_DIR / page).read_bytes()
+        assert before(html) == after(html), page
+        for label, extractor in (
+            ('весь документ', before), (label_after, after)
+        ):
+            seconds, peak = measure(extractor, html)
+            table.add_row(
+                (page, label, f'{seconds * 1000:.2f}', f'{peak / 1024:.0f}')
+            )
+    print(table)
+
+
+if __name__ == '__main__':
+    main()
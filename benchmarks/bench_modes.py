@@ -0,0 +1,144 @@
+"""Офлайн-бенчмарк режимов парсера на корпусе сохранённых страниц.
+
+Каждый режим запускается в отдельном процессе с холодным кешем в памяти,
+страницы отдаёт tests/fixture_data/corpus.py. Запуск из корня проекта:
+    PYTHONPATH=src:. python benchmarks/bench_modes.py
+    PYTHONPATH=src:. python benchmarks/bench_modes.py --check
+    PYTHONPATH=src:. python benchmarks/bench_modes.py --update-baseline
+
+С --check время режимов сравнивается с benchmarks/baseline.json, и при
+замедлении больше чем на --tolerance скрипт завершается с кодом 1.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from prettytable import PrettyTable
+
+BASELINE_PATH = Path(__file__).with_name('baseline.json')
+MODES = ('whats-new', 'latest-versions', 'pep', 'download')
+# Метрики, по которым проверяется замедление относительно baseline,
+# и допустимый абсолютный разброс для коротких замеров.
+CHECKED_METRICS = {'wall_s': 0.05, 'parse_ms': 1.0}
+TOLERANCE = 0.5
+REGRESSION_MESSAGE = '{}: {} = {:.3f}, в baseline {:.3f}'
+
+
+class ParseTimer:
+    """Подменяет BeautifulSoup в модулях и суммирует время разбора."""
+
+    def __init__(self, *modules):
+        self.seconds = 0
+        self.count = 0
+        for module in modules:
+            module.BeautifulSoup = self.wrap(module.BeautifulSoup)
+
+    def wrap(self, soup_class):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return soup_class(*args, **kwargs)
+            finally:
+                self.seconds += time.perf_counter() - start
+                self.count += 1
+        return timed
+
+
+def run_mode(mode):
+    import requests_cache
+
+    import extractors
+    import main
+    import utils
+    from configs import configure_argument_parser
+    from tests.fixture_data.corpus import mount_corpus
+
+    timer = ParseTimer(extractors, utils)
+    session = mount_corpus(requests_cache.CachedSession(backend='memory'))
+    cli_args = configure_argument_parser(main.MODE_TO_FUNCTION).parse_args(
+        [mode]
+    )
+    with tempfile.TemporaryDirectory() as temp_dir:
+        main.BASE_DIR = Path(temp_dir)
+        start = time.perf_counter()
+        main.MODE_TO_FUNCTION[mode](session, cli_args)
+        wall = time.perf_counter() - start
+    pages = session.corpus_adapter.call_count
+    return {
+        'wall_s': wall,
+        'pages': pages,
+        'pages_per_s': pages / wall,
+        'parse_ms': timer.seconds / max(timer.count, 1) * 1000,
+        'peak_rss_mb': (
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        ),
+    }
+
+
+def measure(mode):
+    completed = subprocess.run(
+        [sys.executable, __file__, '--single', mode],
+        capture_output=True, text=True, check=True,
+        env={**os.environ, 'TQDM_DISABLE': '1'},
+    )
+    return json.loads(completed.stdout.splitlines()[-1])
+
+
+def find_regressions(metrics, baseline, tolerance):
+    return [
+        REGRESSION_MESSAGE.format(
+            mode, name, value[name], baseline[mode][name]
+        )
+        for mode, value in metrics.items() if mode in baseline
+        for name, slack in CHECKED_METRICS.items()
+        if value[name] > baseline[mode][name] * (1 + tolerance) + slack
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--single', choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=MODES)
+    parser.add_argument('--check', action='store_true')
+    parser.add_argument('--update-baseline', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE)
+    args = parser.parse_args()
+    if args.single:
+        print(json.dumps(run_mode(args.single)))
+        return
+    metrics = {mode: measure(mode) for mode in args.modes}
+    table = PrettyTable()
+    table.field_names = (
+        'Режим', 'Время, с', 'Страниц', 'Страниц/с', 'Разбор, мс/стр',
+        'Пик RSS, МБ'
+    )
+    table.align = 'l'
+    for mode, value in metrics.items():
+        table.add_row((
+            mode, f'{value["wall_s"]:.3f}', value['pages'],
+            f'{value["pages_per_s"]:.0f}', f'{value["parse_ms"]:.2f}',
+            f'{value["peak_rss_mb"]:.0f}'
+        ))
+    print(table)
+    if args.update_baseline:
+        BASELINE_PATH.write_text(json.dumps({
+            mode: {name: round(number, 3) for name, number in value.items()}
+            for mode, value in metrics.items()
+        }, indent=2) + '\n')
+    if args.check:
+        regressions = find_regressions(
+            metrics, json.loads(BASELINE_PATH.read_text()), args.tolerance
+        )
+        for regression in regressions:
+            print(regression, file=sys.stderr)
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
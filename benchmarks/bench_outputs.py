@@ -0,0 +1,78 @@
+"""Запись и повторное чтение результатов в csv, jsonl и parquet.
+
+Запуск из корня проекта:
+    PYTHONPATH=src:. python benchmarks/bench_outputs.py
+"""
+import csv
+import json
+import tempfile
+import time
+from argparse import Namespace
+from pathlib import Path
+
+from prettytable import PrettyTable
+
+import outputs
+from constants import FILE_OUTPUT, JSONL_OUTPUT, PARQUET_OUTPUT
+
+ROWS = 200_000
+
+
+def make_rows():
+    yield ('Ссылка', 'Номер', 'Заголовок', 'Статус')
+    for number in range(ROWS):
+        yield (
+            f'https://peps.python.org/pep-{number:04d}/',
+            number,
+            f'PEP {number} – Sample title of the proposal',
+            ('Final', 'Active', 'Draft', 'Rejected')[number % 4],
+        )
+
+
+def read_csv(path):
+    with open(path, encoding='utf-8') as file:
+        return list(csv.reader(file))
+
+
+def read_jsonl(path):
+    with open(path, encoding='utf-8') as file:
+        return [json.loads(line) for line in file]
+
+
+def read_parquet(path):
+    return outputs.pyarrow.parquet.read_table(path)
+
+
+READERS = {
+    FILE_OUTPUT: ('csv', read_csv),
+    JSONL_OUTPUT: ('jsonl', read_jsonl),
+    PARQUET_OUTPUT: ('parquet', read_parquet),
+}
+
+
+def main():
+    table = PrettyTable()
+    table.field_names = ('Формат', 'Запись, с', 'Чтение, с', 'Размер, КБ')
+    table.align = 'l'
+    with tempfile.TemporaryDirectory() as temp_dir:
+        outputs.BASE_DIR = Path(temp_dir)
+        for output, (extension, reader) in READERS.items():
+            if output == PARQUET_OUTPUT and outputs.pyarrow is None:
+                continue
+            cli_args = Namespace(mode=output, output=output)
+            start = time.perf_counter()
+            outputs.control_output(make_rows(), cli_args)
+            written = time.perf_counter() - start
+            path, = Path(temp_dir).glob(f'results/{output}_*.{extension}')
+            start = time.perf_counter()
+            reader(path)
+            read = time.perf_counter() - start
+            table.add_row((
+                output, f'{written:.3f}', f'{read:.3f}',
+                f'{path.stat().st_size / 1024:.0f}'
+            ))
+    print(table)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""Матрица способов разбора: страниц в секунду и пик памяти на страницу.
+
+Каждый способ разбора из extractors.PARSERS прогоняется по корпусу
+карточек PEP, страниц What's New и по индексу PEP, результаты
+сверяются с разбором по умолчанию. Пик памяти считает tracemalloc,
+поэтому память самих деревьев lxml (libxml2) в него не попадает.
+Запуск из корня проекта:
+    PYTHONPATH=src:. python benchmarks/bench_parsers.py
+"""
+import time
+import tracemalloc
+
+from prettytable import PrettyTable
+
+from extractors import PARSERS, get_parser
+from tests.fixture_data.corpus import pep_cards, read_page, whats_new_pages
+
+
+def get_corpora():
+    cards = [page.encode() for page in pep_cards().values()]
+    versions = [page.encode() for page in whats_new_pages().values()]
+    return (
+        ('Карточки PEP', 'extract_pep_card', cards),
+        ('Карточки PEP', 'extract_pep_metadata', cards),
+        ("What's New", 'extract_whats_new', versions),
+        ("What's New", 'extract_sections', versions),
+        ("What's New", 'extract_whats_new_outline', versions),
+        ('Индекс PEP', 'extract_pep_index',
+         [read_page('pep-index.html').encode()]),
+    )
+
+
+def measure(extractor, pages):
+    start = time.perf_counter()
+    records = [extractor(page) for page in pages]
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    extractor(pages[0])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return records, len(pages) / seconds, peak
+
+
+def main():
+    table = PrettyTable()
+    table.field_names = (
+        'Корпус', 'Извлечение', 'Разбор', 'Страниц/с', 'Пик памяти, КБ'
+    )
+    table.align = 'l'
+    for corpus, name, pages in get_corpora():
+        expected = None
+        for parser_name, parser in PARSERS.items():
+            records, rate, peak = measure(getattr(parser, name), pages)
+            if parser is get_parser():
+                expected = records
+            assert records == expected, (corpus, name, parser_name)
+            table.add_row((
+                corpus, name, parser_name, f'{rate:.0f}', f'{peak / 1024:.0f}'
+            ))
+    print(table)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""Время запуска: импорт модулей для --help и для каждого режима.
+
+Каждый сценарий запускается в отдельном процессе с python -X importtime.
+Режимы работают без сети, по локальной копии корпуса сохранённых
+страниц (см. --offline). Запуск из корня проекта:
+    PYTHONPATH=src:. python benchmarks/bench_startup.py
+"""
+import os
+import subprocess
+import sys
+import tempfile
+from argparse import Namespace
+from pathlib import Path
+
+from prettytable import PrettyTable
+
+SRC_DIR = Path(__file__).resolve().parent.parent / 'src'
+MODES = ('latest-versions', 'whats-new', 'pep')
+# Зависимости, которые не должны загружаться без необходимости.
+HEAVY_MODULES = (
+    'requests_cache', 'requests', 'bs4', 'lxml', 'tqdm', 'prettytable',
+    'pyarrow', 'asyncio', 'http.server'
+)
+RUN_MODE = """
+import main
+from caching import create_session
+from mirror import attach_mirror
+
+args = main.configure_argument_parser(main.MODE_TO_FUNCTION).parse_args([
+    {mode!r}, '--offline', '--mirror-dir', {mirror_dir!r},
+    '--cache-backend', 'memory', '--no-parsed-cache'
+])
+session = attach_mirror(create_session(args), args)
+main.MODE_TO_FUNCTION[{mode!r}](session, args)
+"""
+
+
+def parse_importtime(stderr):
+    """(время импорта в секундах, имена модулей) из вывода -X importtime.
+
+    Время - сумма накопленного времени модулей верхнего уровня.
+    """
+    total = 0
+    modules = set()
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        modules.add(name.strip())
+        if not name.startswith('  '):
+            total += int(cumulative)
+    return total / 1_000_000, modules
+
+
+def run_importtime(*args):
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', *args],
+        cwd=SRC_DIR, capture_output=True, text=True, check=True,
+        env={**os.environ, 'TQDM_DISABLE': '1'},
+    )
+    return parse_importtime(completed.stderr)
+
+
+def record_mirror(mirror_dir):
+    from requests_cache import CachedSession
+
+    import main
+    from mirror import attach_mirror
+    from tests.fixture_data.corpus import mount_corpus
+
+    session = attach_mirror(
+        mount_corpus(CachedSession(backend='memory')),
+        Namespace(mirror_record=True, mirror_dir=mirror_dir)
+    )
+    for mode in MODES:
+        main.MODE_TO_FUNCTION[mode](session, Namespace())
+
+
+def main():
+    table = PrettyTable()
+    table.field_names = (
+        'Сценарий', 'Импорт, мс', 'Модулей', 'Тяжёлые зависимости'
+    )
+    table.align = 'l'
+    with tempfile.TemporaryDirectory() as temp_dir:
+        record_mirror(Path(temp_dir))
+        scenarios = [('--help', ('main.py', '--help'))] + [
+            (mode, ('-c', RUN_MODE.format(mode=mode, mirror_dir=temp_dir)))
+            for mode in MODES
+        ]
+        for name, args in scenarios:
+            seconds, modules = run_importtime(*args)
+            table.add_row((
+                name, f'{seconds * 1000:.0f}', len(modules),
+                ', '.join(
+                    module for module in HEAVY_MODULES if module in modules
+                )
+            ))
+    print(table)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,205 @@
+import hashlib
+import json
+import sqlite3
+import heapq
+import time
+from threading import Lock
+
+import requests_cache
+from requests_cache import DO_NOT_CACHE
+
+from constants import (
+    BASE_DIR, CACHE_BACKEND_DEFAULT, CACHE_INDEX_TTL, CACHE_MAX_RESPONSES,
+    CACHE_NAME, CACHE_PAGE_TTL, CACHE_TTL_DEFAULT, CACHE_VACUUM_MIN_REMOVED,
+    PARSED_CACHE_MAX_ENTRIES, PARSED_CACHE_NAME
+)
+
+NAMED_BACKENDS = ('memory', 'redis')
+LOG_MESSAGE_CACHE_STATS = (
+    'Кеш: попаданий {}, промахов {}, доля попаданий {:.0%}, '
+    'удалено устаревших и лишних ответов {}'
+)
+LOG_MESSAGE_PARSED_CACHE_STATS = (
+    'Кеш разобранных страниц: попаданий {}, промахов {}, '
+    'вытеснено записей {}'
+)
+
+
+class CacheStats:
+    """Счётчик попаданий и промахов кеша ответов."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._lock = Lock()
+
+    def record(self, response):
+        with self._lock:
+            if getattr(response, 'from_cache', False):
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0
+
+
+CACHE_STATS = CacheStats()
+
+
+class ParsedCache:
+    """Кеш записей, извлечённых из страниц.
+
+    Ключ - хеш пространства имён (извлекающая функция и версия её кода),
+    ссылки и тела ответа, поэтому изменившаяся страница или изменившийся
+    код разбираются заново. Лишние записи вытесняются по давности
+    использования.
+    """
+
+    def __init__(self, path, max_entries=PARSED_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = Lock()
+        self._connection = sqlite3.connect(
+            str(path), check_same_thread=False
+        )
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS records ('
+            'key TEXT PRIMARY KEY, record TEXT, used_at REAL)'
+        )
+
+    @staticmethod
+    def get_key(namespace, url, content):
+        digest = hashlib.sha256(f'{namespace}\0{url}\0'.encode())
+        digest.update(content)
+        return digest.hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT record FROM records WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._connection.execute(
+                'UPDATE records SET used_at = ? WHERE key = ?',
+                (time.time(), key)
+            )
+        return tuple(json.loads(row[0]))
+
+    def set(self, key, record):
+        with self._lock:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO records VALUES (?, ?, ?)',
+                (key, json.dumps(record, ensure_ascii=False), time.time())
+            )
+
+    def clear(self):
+        with self._lock:
+            self._connection.execute('DELETE FROM records')
+            self._connection.commit()
+
+    def save(self):
+        """Сохраняет изменения и возвращает количество вытесненных записей."""
+        with self._lock:
+            evicted = self._connection.execute(
+                'DELETE FROM records WHERE key NOT IN ('
+                'SELECT key FROM records ORDER BY used_at DESC LIMIT ?)',
+                (self.max_entries,)
+            ).rowcount
+            self._connection.commit()
+        return evicted
+
+
+def get_urls_expire_after(index_ttl=CACHE_INDEX_TTL, page_ttl=CACHE_PAGE_TTL):
+    """Время жизни ответов по шаблонам ссылок.
+
+    Шаблоны проверяются по порядку, срабатывает первый подходящий.
+    """
+    return {
+        '*/archives/*': DO_NOT_CACHE,
+        'peps.python.org/pep-*': page_ttl,
+        'docs.python.org/3/whatsnew/*.html': page_ttl,
+        'peps.python.org': index_ttl,
+        'docs.python.org': index_ttl,
+    }
+
+
+def create_session(cli_args=None):
+    backend = getattr(cli_args, 'cache_backend', CACHE_BACKEND_DEFAULT)
+    cache_name = (
+        CACHE_NAME if backend in NAMED_BACKENDS else str(BASE_DIR / CACHE_NAME)
+    )
+    session = requests_cache.CachedSession(
+        cache_name,
+        backend=backend,
+        expire_after=CACHE_TTL_DEFAULT,
+        urls_expire_after=get_urls_expire_after(
+            getattr(cli_args, 'index_ttl', CACHE_INDEX_TTL),
+            getattr(cli_args, 'page_ttl', CACHE_PAGE_TTL)
+        ),
+    )
+    if getattr(cli_args, 'parsed_cache', True):
+        session.parsed_cache = ParsedCache(
+            ':memory:' if backend == 'memory'
+            else BASE_DIR / PARSED_CACHE_NAME,
+            getattr(
+                cli_args, 'parsed_cache_max_entries', PARSED_CACHE_MAX_ENTRIES
+            )
+        )
+    return session
+
+
+def get_eviction_keys(cache, count):
+    """Ключи count ответов, которые вытесняются первыми.
+
+    В sqlite ключи выбираются запросом по индексу срока годности без
+    чтения самих ответов. В остальных хранилищах вытесняются самые
+    старые ответы.
+    """
+    responses = cache.responses
+    if hasattr(responses, 'connection'):
+        # Срок годности есть у всех ответов: время жизни по умолчанию
+        # задаётся в create_session.
+        with responses.connection() as connection:
+            return [key for key, in connection.execute(
+                f'SELECT key FROM {responses.table_name} '
+                'ORDER BY expires LIMIT ?', (count,)
+            )]
+    return [key for _, key in heapq.nsmallest(count, (
+        (response.created_at, key) for key, response in responses.items()
+    ))]
+
+
+def delete_responses(cache, *keys, expired=False):
+    # VACUUM в sqlite переписывает весь файл, поэтому он запускается
+    # отдельно и только после крупной чистки.
+    if hasattr(cache.responses, 'vacuum'):
+        cache.delete(*keys, expired=expired, vacuum=False)
+    else:
+        cache.delete(*keys, expired=expired)
+
+
+def trim_cache(
+    cache, max_responses=CACHE_MAX_RESPONSES,
+    vacuum_min_removed=CACHE_VACUUM_MIN_REMOVED
+):
+    """Удаляет устаревшие ответы, затем лишние сверх лимита.
+
+    Файл sqlite сжимается, только если удалено не меньше
+    vacuum_min_removed ответов.
+    """
+    before = len(cache.responses)
+    delete_responses(cache, expired=True)
+    excess = len(cache.responses) - max_responses
+    if excess > 0:
+        delete_responses(cache, *get_eviction_keys(cache, excess))
+    removed = before - len(cache.responses)
+    if removed >= vacuum_min_removed and hasattr(cache.responses, 'vacuum'):
+        cache.responses.vacuum()
+    return removed
@@ -0,0 +1,94 @@
+import json
+from contextlib import contextmanager
+
+from constants import CHECKPOINT_FLUSH_EVERY
+
+
+def iter_jsonl(path):
+    """Записи файла JSON Lines, который только дописывается."""
+    if not path.exists():
+        return
+    with open(path, encoding='utf-8') as file:
+        for line in file:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                # Последняя строка могла оборваться при падении.
+                continue
+
+
+class CrawlJournal:
+    """Журнал обработанных ссылок обхода для продолжения прерванного запуска.
+
+    Каждая строка файла - JSON {"u": ссылка, "r": извлечённая запись}.
+    Запись дописывается в конец, на диск сбрасывается пачками.
+    """
+
+    def __init__(
+        self, path, completed=None, flush_every=CHECKPOINT_FLUSH_EVERY
+    ):
+        self.path = path
+        self.completed = completed or {}
+        self.flush_every = flush_every
+        self._unflushed = 0
+        self._file = None
+
+    @classmethod
+    def load(cls, path):
+        completed = {
+            entry['u']: tuple(entry['r']) for entry in iter_jsonl(path)
+        }
+        return cls(path, completed)
+
+    def append(self, url, record):
+        if self._file is None:
+            self.path.parent.mkdir(exist_ok=True)
+            self._file = open(self.path, 'a', encoding='utf-8')
+        self._file.write(json.dumps(
+            {'u': url, 'r': record}, ensure_ascii=False,
+            separators=(',', ':')
+        ) + '\n')
+        self.completed[url] = tuple(record)
+        self._unflushed += 1
+        if self._unflushed >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        if self._file is not None:
+            self._file.flush()
+        self._unflushed = 0
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def replay(self, urls, process):
+        """Возвращает (url, record, error) в порядке urls.
+
+        Готовые записи берутся из журнала, остальные ссылки передаются
+        в process одним списком, а его результаты дописываются в журнал.
+        """
+        done = set(self.completed)
+        fresh = process([url for url in urls if url not in done])
+        for url in urls:
+            if url in done:
+                yield url, self.completed[url], None
+                continue
+            url, record, error = next(fresh)
+            if error is None and record is not None:
+                self.append(url, record)
+            yield url, record, error
+
+
+@contextmanager
+def open_journal(path, resume=False):
+    """Журнал обхода, который удаляется после успешного завершения."""
+    if not resume:
+        path.unlink(missing_ok=True)
+    journal = CrawlJournal.load(path)
+    try:
+        yield journal
+    finally:
+        journal.close()
+    path.unlink(missing_ok=True)
@@ -1,16 +1,28 @@
 import argparse
 import logging
+from importlib.util import find_spec
 from logging.handlers import RotatingFileHandler
+from pathlib import Path
 
 from constants import (
-    DATETIME_FORMAT, FILE_OUTPUT, LOG_DIR, LOG_FORMAT,
-    PRETTY_OUTPUT
+    BASE_DIR, CACHE_BACKEND_DEFAULT, CACHE_BACKENDS, CACHE_INDEX_TTL,
+    CACHE_MAX_RESPONSES, CACHE_PAGE_TTL, DATETIME_FORMAT, DOWNLOAD_FORMATS,
+    DOWNLOAD_FORMATS_DEFAULT, FILE_OUTPUT, HOST_RATE_DEFAULT, JSONL_OUTPUT,
+    LOG_DIR, LOG_FORMAT, MIRROR_DIR, PARQUET_OUTPUT, PARSED_CACHE_MAX_ENTRIES,
+    PARSER_BS4, PARSER_HTML, PARSER_LXML, PRETTY_OUTPUT, PROCESSES_DEFAULT,
+    RETRIES_DEFAULT, SEARCH_LIMIT_DEFAULT, SERVE_PORT, SERVE_REFRESH,
+    SOUP_CACHE_MAX_MB, WORKERS_DEFAULT
 )
 
+POSITIVE_INT_ERROR = 'Ожидается целое число больше нуля: {}'
+NON_NEGATIVE_ERROR = 'Ожидается неотрицательное число: {}'
+REDIS_MISSING_MESSAGE = 'Для кеша в redis установите пакет redis'
+
 
 def configure_logging():
-    LOG_DIR.mkdir()
-    log_file = LOG_DIR / 'pep_parser.log'
+    log_dir = BASE_DIR / LOG_DIR
+    log_dir.mkdir(exist_ok=True)
+    log_file = log_dir / 'pep_parser.log'
     rotating_handler = RotatingFileHandler(
         log_file, maxBytes=10 ** 6, backupCount=5
     )
@@ -22,19 +34,48 @@ def configure_logging():
     )
 
 
+def positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(POSITIVE_INT_ERROR.format(value))
+    return number
+
+
+def non_negative_int(value):
+    number = int(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(NON_NEGATIVE_ERROR.format(value))
+    return number
+
+
+def non_negative_float(value):
+    number = float(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(NON_NEGATIVE_ERROR.format(value))
+    return number
+
+
+def cache_backend(value):
+    # Пакет только ищется, а не импортируется: проверка не замедляет запуск.
+    if value == 'redis' and find_spec('redis') is None:
+        raise argparse.ArgumentTypeError(REDIS_MISSING_MESSAGE)
+    return value
+
+
 def configure_argument_parser(available_modes):
     parser = argparse.ArgumentParser(
         description='Парсер документации Python'
     )
     parser.add_argument(
         'mode',
+        nargs='+',
         choices=available_modes,
         help='Режимы работы парсера'
     )
     parser.add_argument(
         '-o',
         '--output',
-        choices=(PRETTY_OUTPUT, FILE_OUTPUT),
+        choices=(PRETTY_OUTPUT, FILE_OUTPUT, JSONL_OUTPUT, PARQUET_OUTPUT),
         help='Дополнительные способы вывода данных'
     )
     parser.add_argument(
@@ -43,4 +84,176 @@ def configure_argument_parser(available_modes):
         action='store_true',
         help='Очистка кеша'
     )
+    parser.add_argument(
+        '--cache-backend',
+        type=cache_backend,
+        choices=CACHE_BACKENDS,
+        default=CACHE_BACKEND_DEFAULT,
+        help='Хранилище кеша ответов'
+    )
+    parser.add_argument(
+        '--cache-max-responses',
+        type=positive_int,
+        default=CACHE_MAX_RESPONSES,
+        metavar='N',
+        help='Максимальное количество ответов в кеше'
+    )
+    parser.add_argument(
+        '--index-ttl',
+        type=non_negative_int,
+        default=CACHE_INDEX_TTL,
+        metavar='SECONDS',
+        help='Сколько хранить в кеше индексные страницы'
+    )
+    parser.add_argument(
+        '--page-ttl',
+        type=non_negative_int,
+        default=CACHE_PAGE_TTL,
+        metavar='SECONDS',
+        help="Сколько хранить в кеше карточки PEP и страницы What's New"
+    )
+    parser.add_argument(
+        '--no-parsed-cache',
+        dest='parsed_cache',
+        action='store_false',
+        help='Не использовать кеш разобранных страниц'
+    )
+    parser.add_argument(
+        '--parsed-cache-max-entries',
+        type=positive_int,
+        default=PARSED_CACHE_MAX_ENTRIES,
+        metavar='N',
+        help='Максимальное количество записей в кеше разобранных страниц'
+    )
+    parser.add_argument(
+        '--soup-cache-mb',
+        type=non_negative_int,
+        default=SOUP_CACHE_MAX_MB,
+        metavar='N',
+        help='Сколько мегабайт памяти держать под разобранные страницы'
+    )
+    parser.add_argument(
+        '-s',
+        '--stream',
+        action='store_true',
+        help='Выводить строки результата по мере получения'
+    )
+    parser.add_argument(
+        '-w',
+        '--workers',
+        type=positive_int,
+        default=WORKERS_DEFAULT,
+        metavar='N',
+        help='Количество параллельных загрузок'
+    )
+    parser.add_argument(
+        '-p',
+        '--processes',
+        type=positive_int,
+        default=PROCESSES_DEFAULT,
+        metavar='N',
+        help='Количество процессов для разбора страниц'
+    )
+    parser.add_argument(
+        '-i',
+        '--incremental',
+        action='store_true',
+        help='Загружать только изменившиеся карточки PEP'
+    )
+    parser.add_argument(
+        '-f',
+        '--formats',
+        nargs='+',
+        choices=DOWNLOAD_FORMATS,
+        default=DOWNLOAD_FORMATS_DEFAULT,
+        metavar='FORMAT',
+        help='Форматы архивов документации для режима download: {}'.format(
+            ', '.join(DOWNLOAD_FORMATS)
+        )
+    )
+    parser.add_argument(
+        '-r',
+        '--resume',
+        action='store_true',
+        help='Продолжить прерванный обход с последней контрольной точки'
+    )
+    parser.add_argument(
+        '-q',
+        '--query',
+        default='',
+        help='Поисковый запрос для режима search'
+    )
+    parser.add_argument(
+        '--limit',
+        type=positive_int,
+        default=SEARCH_LIMIT_DEFAULT,
+        metavar='N',
+        help='Максимальное количество результатов поиска'
+    )
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='Вывести в конце работы время по этапам'
+    )
+    parser.add_argument(
+        '--profile-json',
+        metavar='PATH',
+        help='Сохранить время по этапам в JSON-файл'
+    )
+    parser.add_argument(
+        '--parser',
+        choices=(PARSER_BS4, PARSER_LXML, PARSER_HTML),
+        default=PARSER_BS4,
+        help='Способ разбора страниц'
+    )
+    parser.add_argument(
+        '--rate',
+        type=non_negative_float,
+        default=HOST_RATE_DEFAULT,
+        metavar='N',
+        help='Запросов в секунду к одному хосту, 0 - без ограничения'
+    )
+    parser.add_argument(
+        '--retries',
+        type=non_negative_int,
+        default=RETRIES_DEFAULT,
+        metavar='N',
+        help='Количество повторов страницы при временных ошибках'
+    )
+    parser.add_argument(
+        '--mirror-record',
+        action='store_true',
+        help='Сохранять загруженные страницы в локальную копию'
+    )
+    parser.add_argument(
+        '--offline',
+        action='store_true',
+        help='Работать без сети, только по локальной копии страниц'
+    )
+    parser.add_argument(
+        '--mirror-dir',
+        type=Path,
+        default=BASE_DIR / MIRROR_DIR,
+        metavar='PATH',
+        help='Каталог локальной копии страниц'
+    )
+    parser.add_argument(
+        '--port',
+        type=positive_int,
+        default=SERVE_PORT,
+        help='Порт HTTP API режима serve'
+    )
+    parser.add_argument(
+        '--socket',
+        type=Path,
+        metavar='PATH',
+        help='Unix-сокет для API режима serve вместо порта'
+    )
+    parser.add_argument(
+        '--refresh',
+        type=non_negative_float,
+        default=SERVE_REFRESH,
+        metavar='SECONDS',
+        help='Как часто serve обновляет результаты, 0 - только по запросу'
+    )
     return parser
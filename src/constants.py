@@ -29,9 +29,61 @@ LOG_MESSAGE_TEMPLATE = (
 LOG_DIR = 'logs'
 RESULTS_DIR = 'results'
 DOWNLOADS_DIRECTORY = 'downloads'
+PEP_STATUS_INDEX = 'pep_status_index.json'
+CHECKPOINT_DIR = 'checkpoints'
+SEARCH_INDEX_DIR = 'search_index'
+MIRROR_DIR = 'mirror'
+SEARCH_LIMIT_DEFAULT = 20
+SERVE_HOST = '127.0.0.1'
+SERVE_PORT = 8080
+# Раз в сколько секунд режим serve пересчитывает результаты.
+SERVE_REFRESH = 3600
+CHECKPOINT_FLUSH_EVERY = 20
+CACHE_NAME = 'http_cache'
+CACHE_BACKENDS = ('sqlite', 'filesystem', 'memory', 'redis')
+CACHE_BACKEND_DEFAULT = 'sqlite'
+CACHE_MAX_RESPONSES = 5000
+CACHE_VACUUM_MIN_REMOVED = 1000
+# Время жизни ответов в кеше, секунды: индексные страницы меняются часто,
+# карточки PEP и страницы What's New - редко.
+CACHE_INDEX_TTL = 60 * 60
+CACHE_PAGE_TTL = 7 * 24 * 60 * 60
+CACHE_TTL_DEFAULT = 24 * 60 * 60
+PARSED_CACHE_NAME = 'parsed_cache.sqlite'
+PARSED_CACHE_MAX_ENTRIES = 20000
+SOUP_CACHE_MAX_MB = 64
+# Во сколько раз дерево BeautifulSoup в памяти больше исходной страницы.
+SOUP_SIZE_FACTOR = 30
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+DOWNLOAD_FORMATS = (
+    'pdf-a4.zip', 'pdf-a4.tar.bz2', 'pdf-letter.zip', 'pdf-letter.tar.bz2',
+    'html.zip', 'html.tar.bz2', 'text.zip', 'text.tar.bz2', 'epub',
+)
+DOWNLOAD_FORMATS_DEFAULT = ('pdf-a4.zip',)
+
 
+WORKERS_DEFAULT = 4
+PER_HOST_LIMIT = 8
+PROCESSES_DEFAULT = 1
+# Сколько задач на одного исполнителя держится в работе одновременно.
+FETCH_WINDOW_FACTOR = 2
+PARSE_WINDOW_FACTOR = 4
+PARSER_BS4 = 'bs4-lxml'
+PARSER_LXML = 'lxml'
+PARSER_HTML = 'html.parser'
+# Запросов в секунду к одному хосту, 0 - без ограничения.
+HOST_RATE_DEFAULT = 10
+RETRIES_DEFAULT = 3
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30
+# Доля ссылок обхода, которую можно повторить, но не меньше минимума.
+RETRY_BUDGET_RATIO = 0.1
+RETRY_BUDGET_MIN = 10
 
 PRETTY_OUTPUT = 'pretty'
 FILE_OUTPUT = 'file'
+JSONL_OUTPUT = 'jsonl'
+PARQUET_OUTPUT = 'parquet'
+PARQUET_BATCH_SIZE = 10_000
 
 NO_SIDEBAR_FUNCTIONS = 'На боковой панели не найдено ни одной версии'
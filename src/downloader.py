@@ -0,0 +1,187 @@
+import hashlib
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+from requests import RequestException
+from tqdm import tqdm
+
+from constants import DOWNLOAD_CHUNK_SIZE, WORKERS_DEFAULT
+from exceptions import DownloadError
+from utils import bypass_cache, get_response
+
+PART_SUFFIX = '.part'
+DOWNLOADED = 'downloaded'
+UP_TO_DATE = 'up to date'
+FAILED = 'failed'
+CHECKSUM_SUFFIX = '.sha256'
+ETAG_SUFFIX = '.etag'
+LOG_MESSAGE_UP_TO_DATE = 'Файл {} уже загружен, пропускаем'
+LOG_MESSAGE_RESUME = 'Продолжение загрузки {} с байта {}'
+RANGE_NOT_SATISFIABLE = HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE
+LOG_MESSAGE_DOWNLOADED = (
+    'Загружено {} байт за {:.1f} с ({:.0f} КБ/с), sha256 {}'
+)
+SIZE_ERROR_MESSAGE = 'Размер файла {} ({}) не совпадает с ожидаемым ({})'
+CHECKSUM_ERROR_MESSAGE = 'Контрольная сумма файла {} не совпадает: {} != {}'
+
+
+def file_digest(path, chunk_size=DOWNLOAD_CHUNK_SIZE):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest
+
+
+def get_expected_size(response, offset):
+    if response.status_code == HTTPStatus.PARTIAL_CONTENT:
+        total = response.headers.get('Content-Range', '').rpartition('/')[2]
+        if total.isdigit():
+            return int(total)
+    length = response.headers.get('Content-Length')
+    if length is None:
+        return None
+    return int(length) + offset
+
+
+def read_sidecar(path, suffix):
+    sidecar = path.with_name(path.name + suffix)
+    if not sidecar.exists():
+        return None
+    return sidecar.read_text(encoding='utf-8')
+
+
+def is_up_to_date(session, url, path):
+    """Сравнивает файл с ответом на HEAD и сохранённой sha256."""
+    if not path.exists():
+        return False
+    response = session.head(
+        url, headers=bypass_cache({'Accept-Encoding': 'identity'})
+    )
+    if not response.ok:
+        return False
+    length = response.headers.get('Content-Length')
+    if length is not None and int(length) != path.stat().st_size:
+        return False
+    etag = response.headers.get('ETag')
+    stored_etag = read_sidecar(path, ETAG_SUFFIX)
+    if etag is not None and stored_etag is not None and stored_etag != etag:
+        return False
+    if etag is None and length is None:
+        return False
+    sha256 = read_sidecar(path, CHECKSUM_SUFFIX)
+    if sha256 is None:
+        return True
+    actual = file_digest(path).hexdigest()
+    if actual != sha256:
+        logging.warning(
+            CHECKSUM_ERROR_MESSAGE.format(path.name, actual, sha256)
+        )
+        return False
+    return True
+
+
+def download_file(
+    session, url, path, chunk_size=DOWNLOAD_CHUNK_SIZE, sha256=None,
+    position=None
+):
+    """Загружает файл по частям с докачкой, минуя кеш ответов.
+
+    Недокачанный файл лежит рядом с расширением .part, после проверки
+    размера и контрольной суммы он переименовывается, а sha256
+    записывается в файл с расширением .sha256. Если контрольная сумма
+    не передана, а ETag совпадает с сохранённым, файл сверяется
+    с sha256 прошлой загрузки.
+    """
+    part_path = path.with_name(path.name + PART_SUFFIX)
+    offset = part_path.stat().st_size if part_path.exists() else 0
+    headers = bypass_cache({'Accept-Encoding': 'identity'})
+    if offset:
+        headers['Range'] = f'bytes={offset}-'
+        logging.info(LOG_MESSAGE_RESUME.format(path.name, offset))
+    start = time.monotonic()
+    with get_response(session, url, headers=headers, stream=True) as response:
+        if response.status_code == RANGE_NOT_SATISFIABLE:
+            part_path.unlink()
+            return download_file(
+                session, url, path, chunk_size, sha256, position
+            )
+        response.raise_for_status()
+        if response.status_code != HTTPStatus.PARTIAL_CONTENT:
+            offset = 0
+        expected_size = get_expected_size(response, offset)
+        etag = response.headers.get('ETag')
+        stored_etag = read_sidecar(path, ETAG_SUFFIX)
+        if sha256 is None and etag is not None and etag == stored_etag:
+            sha256 = read_sidecar(path, CHECKSUM_SUFFIX)
+        digest = write_chunks(
+            response, part_path, offset, expected_size, chunk_size, position
+        )
+    size = part_path.stat().st_size
+    if expected_size is not None and size != expected_size:
+        raise DownloadError(
+            SIZE_ERROR_MESSAGE.format(path.name, size, expected_size)
+        )
+    if sha256 is not None and digest.hexdigest() != sha256:
+        part_path.unlink()
+        raise DownloadError(CHECKSUM_ERROR_MESSAGE.format(
+            path.name, digest.hexdigest(), sha256
+        ))
+    part_path.replace(path)
+    mirror = getattr(session, 'mirror', None)
+    if mirror is not None:
+        mirror.add_file(url, path, {'ETag': etag}, digest.hexdigest())
+    path.with_name(path.name + CHECKSUM_SUFFIX).write_text(
+        digest.hexdigest(), encoding='utf-8'
+    )
+    if etag is not None:
+        path.with_name(path.name + ETAG_SUFFIX).write_text(
+            etag, encoding='utf-8'
+        )
+    elapsed = time.monotonic() - start
+    logging.info(LOG_MESSAGE_DOWNLOADED.format(
+        size, elapsed, size / 1024 / max(elapsed, 1e-6), digest.hexdigest()
+    ))
+
+
+def write_chunks(
+    response, part_path, offset, expected_size, chunk_size, position=None
+):
+    digest = file_digest(part_path) if offset else hashlib.sha256()
+    with open(part_path, 'ab' if offset else 'wb') as file, tqdm(
+        total=expected_size,
+        initial=offset,
+        unit='B',
+        unit_scale=True,
+        unit_divisor=1024,
+        desc=part_path.stem,
+        position=position,
+    ) as progress:
+        for chunk in response.iter_content(chunk_size):
+            file.write(chunk)
+            digest.update(chunk)
+            progress.update(len(chunk))
+    return digest
+
+
+def download_files(session, downloads, workers=WORKERS_DEFAULT):
+    """Параллельно загружает пары (url, path).
+
+    Возвращает тройки (url, status, error), где status — DOWNLOADED,
+    UP_TO_DATE или FAILED.
+    """
+    def load(position, download):
+        url, path = download
+        try:
+            if is_up_to_date(session, url, path):
+                logging.info(LOG_MESSAGE_UP_TO_DATE.format(path.name))
+                return url, UP_TO_DATE, None
+            download_file(session, url, path, position=position)
+        except (ConnectionError, RequestException, DownloadError) as error:
+            return url, FAILED, error
+        return url, DOWNLOADED, None
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(load, range(len(downloads)), downloads))
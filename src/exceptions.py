@@ -11,3 +11,18 @@ class NoResponseException(Exception):
 class NoVersionsFoundError(Exception):
     """Версия не найдена."""
     pass
+
+
+class DownloadError(Exception):
+    """Загруженный файл не прошёл проверку."""
+    pass
+
+
+class MissingDependencyError(Exception):
+    """Не установлен необязательный пакет."""
+    pass
+
+
+class SearchIndexNotFoundError(Exception):
+    """Поисковый индекс ещё не построен."""
+    pass
@@ -0,0 +1,433 @@
+import hashlib
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from dataclasses import dataclass
+from functools import partial
+from http import HTTPStatus
+from pathlib import Path
+
+import lxml.html
+from bs4 import BeautifulSoup, NavigableString, SoupStrainer, Tag
+
+from constants import (
+    PARSE_WINDOW_FACTOR, PARSER_BS4, PARSER_HTML, PARSER_LXML,
+    PROCESSES_DEFAULT
+)
+from exceptions import ParserFindTagException
+from metrics import METRICS, PARSE
+from utils import ERROR_MESSAGE_FIND_TAG, find_tag, map_bounded
+
+BS4_FEATURES = 'lxml'
+# Из страниц разбираются только нужные поддеревья, а не весь документ.
+PEP_CARD_TAGS = SoupStrainer(['h1', 'dl'])
+WHATS_NEW_TAGS = SoupStrainer(['h1', 'dl'])
+PEP_INDEX_SECTION = {'id': 'numerical-index'}
+PEP_CARD_CLASS = 'rfc2822 field-list simple'
+HEADING_TAGS = ('h1', 'h2', 'h3', 'h4')
+HEADING_XPATH = '|'.join(f'./{tag}' for tag in HEADING_TAGS)
+# Разделы читаются деревом lxml: нужен весь текст страницы, а не поддерево.
+SKIPPED_TAGS = frozenset(('section', 'script', 'style'))
+HEADING_CHARS = ' \n¶'
+MODULE_CLASS = 'py-mod'
+MODULE_XPATH = '//code[contains(concat(" ", @class, " "), " py-mod ")]'
+PEP_LINK_PATTERN = re.compile(r'/pep-(?P<number>\d+)')
+PEP_METADATA_FIELDS = (
+    'Author', 'Status', 'Type', 'Created', 'Python-Version', 'Post-History',
+    'Replaces', 'Superseded-By'
+)
+# Любая правка этого модуля сбрасывает кеш разобранных страниц.
+EXTRACTORS_VERSION = hashlib.sha256(
+    Path(__file__).read_bytes()
+).hexdigest()[:12]
+
+
+def get_field(card, name):
+    for tag in card.find_all('dt'):
+        if tag.text == f'{name}:':
+            return tag.find_next_sibling('dd').text
+    return ''
+
+
+@dataclass
+class PepMetadata:
+    """Поля карточки PEP без ссылок на дерево разбора.
+
+    Строки итерируются как кортеж, поэтому записи передаются в выводы
+    без преобразования.
+    """
+
+    __slots__ = (
+        'number', 'title', 'author', 'status', 'type', 'created',
+        'python_version', 'post_history', 'replaces', 'superseded_by'
+    )
+    number: int
+    title: str
+    author: str
+    status: str
+    type: str
+    created: str
+    python_version: str
+    post_history: str
+    replaces: str
+    superseded_by: str
+
+    def __iter__(self):
+        return (getattr(self, name) for name in self.__slots__)
+
+    def __len__(self):
+        return len(self.__slots__)
+
+
+def find_pep_card(html, features=BS4_FEATURES):
+    soup = BeautifulSoup(html, features, parse_only=PEP_CARD_TAGS)
+    main_card = find_tag(soup, 'dl', {'class': PEP_CARD_CLASS})
+    title = main_card.find_previous('h1')
+    return main_card, title.text if title is not None else ''
+
+
+def extract_pep_card(html, features=BS4_FEATURES):
+    main_card, title = find_pep_card(html, features)
+    return (
+        get_field(main_card, 'Status'),
+        title,
+        get_field(main_card, 'Author').replace('\n', ' '),
+    )
+
+
+def extract_pep_metadata(html, features=BS4_FEATURES):
+    """Заголовок и все поля PEP_METADATA_FIELDS карточки."""
+    main_card, title = find_pep_card(html, features)
+    return (title, *(
+        ' '.join(get_field(main_card, name).split())
+        for name in PEP_METADATA_FIELDS
+    ))
+
+
+def extract_whats_new(html, features=BS4_FEATURES):
+    soup = BeautifulSoup(html, features, parse_only=WHATS_NEW_TAGS)
+    h1 = find_tag(soup, 'h1')
+    dl = find_tag(soup, 'dl')
+    return h1.text, dl.text.replace('\n', ' ')
+
+
+def extract_pep_index(html):
+    """Номер PEP -> (тип, статус, ссылка) за один проход по таблице.
+
+    Индекс - самая большая страница, поэтому он читается деревом lxml
+    без построения дерева BeautifulSoup.
+    """
+    section = lxml.html.fromstring(html).find(
+        './/section[@id="numerical-index"]'
+    )
+    if section is None:
+        raise ParserFindTagException(
+            ERROR_MESSAGE_FIND_TAG.format('section', PEP_INDEX_SECTION)
+        )
+    pep_index = {}
+    for row in section.iter('tr'):
+        cells = row.findall('td')
+        if not cells:
+            continue
+        letters = cells[0].text_content()
+        link = cells[1].find('a')
+        pep_index[int(link.text_content())] = (
+            letters[:1], letters[1:], link.get('href')
+        )
+    return pep_index
+
+
+def _own_text(element):
+    """Текст элемента без вложенных разделов, скриптов и комментариев."""
+    parts = [element.text or '']
+    for child in element:
+        if isinstance(child.tag, str) and child.tag not in SKIPPED_TAGS:
+            parts.append(_own_text(child))
+        parts.append(child.tail or '')
+    # Соседние блоки (пункты списка, ячейки) не должны склеиваться в слово.
+    return ' '.join(parts)
+
+
+def extract_sections(html):
+    """Заголовок страницы и (якорь, заголовок, текст) её разделов.
+
+    Текст вложенного раздела не повторяется в тексте внешнего.
+    """
+    root = lxml.html.fromstring(html)
+    title = root.find('.//h1[@class="page-title"]')
+    if title is None:
+        title = root.find('.//h1')
+    sections = []
+    for section in root.iter('section'):
+        anchor = section.get('id')
+        text = ' '.join(_own_text(section).split())
+        if not anchor or not text:
+            continue
+        heading = section.xpath(HEADING_XPATH)
+        sections.append((
+            anchor,
+            heading[0].text_content().strip(HEADING_CHARS) if heading else '',
+            text
+        ))
+    return (
+        title.text_content().strip(HEADING_CHARS) if title is not None
+        else '',
+        tuple(sections)
+    )
+
+
+def outline_record(title, headings, modules, links):
+    """Строка очерка: заголовок, разделы, модули и номера PEP по ссылкам."""
+    numbers = sorted({
+        int(match['number']) for match in map(PEP_LINK_PATTERN.search, links)
+        if match
+    })
+    return (
+        title.strip(HEADING_CHARS),
+        '; '.join(heading.strip(HEADING_CHARS) for heading in headings),
+        ', '.join(dict.fromkeys(modules)),
+        ', '.join(map(str, numbers))
+    )
+
+
+def extract_whats_new_outline(html):
+    """Очерк страницы What's New без текста разделов.
+
+    Разделы - заголовки второго уровня, модули - ссылки на модули
+    в порядке первого упоминания, PEP - номера из ссылок на PEP.
+    """
+    root = lxml.html.fromstring(html)
+    title = root.find('.//h1')
+    return outline_record(
+        title.text_content() if title is not None else '',
+        (heading.text_content() for heading in root.xpath('//section/h2')),
+        (code.text_content() for code in root.xpath(MODULE_XPATH)),
+        (link.get('href', '') for link in root.iter('a'))
+    )
+
+
+def _lxml_field(card, name):
+    for tag in card.iter('dt'):
+        if tag.text_content() == f'{name}:':
+            return next(tag.itersiblings('dd')).text_content()
+    return ''
+
+
+def _soup_own_text(tag):
+    """То же, что _own_text, для дерева BeautifulSoup."""
+    parts = []
+    for child in tag.children:
+        if isinstance(child, Tag):
+            if child.name not in SKIPPED_TAGS:
+                parts.append(_soup_own_text(child))
+        elif type(child) is NavigableString:
+            parts.append(child)
+    return ' '.join(parts)
+
+
+class SoupParser:
+    """Карточки и страницы версий разбираются BeautifulSoup.
+
+    features - парсер BeautifulSoup, им же создаются супы страниц, по
+    которым собираются ссылки. Индекс PEP и разделы страниц читаются
+    деревом lxml.
+    """
+
+    extract_pep_index = staticmethod(extract_pep_index)
+    extract_sections = staticmethod(extract_sections)
+    extract_whats_new_outline = staticmethod(extract_whats_new_outline)
+
+    def __init__(self, features=BS4_FEATURES):
+        self.features = features
+
+    def extract_pep_card(self, html):
+        return extract_pep_card(html, self.features)
+
+    def extract_pep_metadata(self, html):
+        return extract_pep_metadata(html, self.features)
+
+    def extract_whats_new(self, html):
+        return extract_whats_new(html, self.features)
+
+
+class HtmlParser(SoupParser):
+    """Только стандартная библиотека: BeautifulSoup с html.parser."""
+
+    def __init__(self):
+        super().__init__('html.parser')
+
+    def extract_pep_index(self, html):
+        section = BeautifulSoup(html, self.features, parse_only=SoupStrainer(
+            'section', attrs=PEP_INDEX_SECTION
+        )).section
+        if section is None:
+            raise ParserFindTagException(
+                ERROR_MESSAGE_FIND_TAG.format('section', PEP_INDEX_SECTION)
+            )
+        pep_index = {}
+        for row in section.find_all('tr'):
+            cells = row.find_all('td', recursive=False)
+            if not cells:
+                continue
+            letters = cells[0].get_text()
+            link = cells[1].find('a')
+            pep_index[int(link.get_text())] = (
+                letters[:1], letters[1:], link.get('href')
+            )
+        return pep_index
+
+    def extract_sections(self, html):
+        soup = BeautifulSoup(html, self.features)
+        title = soup.find('h1', attrs={'class': 'page-title'})
+        if title is None:
+            title = soup.find('h1')
+        sections = []
+        for section in soup.find_all('section'):
+            anchor = section.get('id')
+            text = ' '.join(_soup_own_text(section).split())
+            if not anchor or not text:
+                continue
+            heading = section.find(HEADING_TAGS, recursive=False)
+            sections.append((
+                anchor,
+                heading.get_text().strip(HEADING_CHARS) if heading else '',
+                text
+            ))
+        return (
+            title.get_text().strip(HEADING_CHARS) if title is not None
+            else '',
+            tuple(sections)
+        )
+
+    def extract_whats_new_outline(self, html):
+        soup = BeautifulSoup(html, self.features)
+        title = soup.find('h1')
+        return outline_record(
+            title.get_text() if title is not None else '',
+            (heading.get_text() for heading in soup.select('section > h2')),
+            (code.get_text() for code in soup.find_all(
+                'code', class_=MODULE_CLASS
+            )),
+            (link.get('href', '') for link in soup.find_all('a'))
+        )
+
+
+class LxmlParser(SoupParser):
+    """Страницы читаются деревом lxml.html с XPath, без BeautifulSoup."""
+
+    def find_pep_card(self, html):
+        cards = lxml.html.fromstring(html).xpath(
+            '//dl[@class=$name]', name=PEP_CARD_CLASS
+        )
+        if not cards:
+            raise ParserFindTagException(ERROR_MESSAGE_FIND_TAG.format(
+                'dl', {'class': PEP_CARD_CLASS}
+            ))
+        title = cards[0].xpath('preceding::h1[1]')
+        return cards[0], title[0].text_content() if title else ''
+
+    def extract_pep_card(self, html):
+        main_card, title = self.find_pep_card(html)
+        return (
+            _lxml_field(main_card, 'Status'),
+            title,
+            _lxml_field(main_card, 'Author').replace('\n', ' '),
+        )
+
+    def extract_pep_metadata(self, html):
+        main_card, title = self.find_pep_card(html)
+        return (title, *(
+            ' '.join(_lxml_field(main_card, name).split())
+            for name in PEP_METADATA_FIELDS
+        ))
+
+    def extract_whats_new(self, html):
+        root = lxml.html.fromstring(html)
+        h1, dl = root.find('.//h1'), root.find('.//dl')
+        for tag, element in (('h1', h1), ('dl', dl)):
+            if element is None:
+                raise ParserFindTagException(
+                    ERROR_MESSAGE_FIND_TAG.format(tag, None)
+                )
+        return h1.text_content(), dl.text_content().replace('\n', ' ')
+
+
+PARSERS = {
+    PARSER_BS4: SoupParser(),
+    PARSER_LXML: LxmlParser(),
+    PARSER_HTML: HtmlParser(),
+}
+
+
+def get_parser(cli_args=None):
+    return PARSERS[getattr(cli_args, 'parser', PARSER_BS4)]
+
+
+def get_content(response):
+    if response is None or response.status_code == HTTPStatus.NOT_MODIFIED:
+        return None
+    return response.content
+
+
+def _extract(extractor, page):
+    url, html, error, record = page
+    if record is not None:
+        return url, record, None, 0
+    if error is not None or html is None:
+        return url, None, error, 0
+    start = time.perf_counter()
+    try:
+        return url, extractor(html), None, time.perf_counter() - start
+    except ParserFindTagException as error:
+        return url, None, error, time.perf_counter() - start
+
+
+def _get_pages(extractor, fetched, cache, keys):
+    """Возвращает (url, html, error, record) с записью из кеша, если есть."""
+    namespace = f'{extractor.__name__}:{EXTRACTORS_VERSION}'
+    for url, response, error in fetched:
+        html = get_content(response)
+        if cache is None or html is None:
+            yield url, html, error, None
+            continue
+        keys[url] = cache.get_key(namespace, url, html)
+        record = cache.get(keys[url])
+        yield url, None if record is not None else html, error, record
+
+
+def _collect(extracted, cache, keys):
+    # Время разбора меряется там, где шёл разбор, в том числе в дочерних
+    # процессах, и учитывается в родительском.
+    for url, record, error, seconds in extracted:
+        if seconds:
+            METRICS.record(PARSE, seconds)
+            if cache is not None and record is not None:
+                cache.set(keys[url], record)
+        yield url, record, error
+
+
+def extract_all(
+    extractor, fetched, processes=PROCESSES_DEFAULT, cache=None
+):
+    """Разбирает результаты загрузчика, возвращает (url, record, error).
+
+    Для неизменившихся страниц (ответ 304) record и error равны None.
+    cache - необязательный ParsedCache: страницы, разобранные раньше,
+    повторно не разбираются.
+    """
+    keys = {}
+    pages = _get_pages(extractor, fetched, cache, keys)
+    extract = partial(_extract, extractor)
+    if processes == 1:
+        yield from _collect(map(extract, pages), cache, keys)
+        return
+    # Пул создаётся и из потоков режимов (run_modes), а fork процесса
+    # с работающими потоками небезопасен, поэтому процессы запускаются
+    # через spawn.
+    with ProcessPoolExecutor(
+        max_workers=processes, mp_context=get_context('spawn')
+    ) as executor:
+        yield from _collect(map_bounded(
+            executor, extract, pages, window=PARSE_WINDOW_FACTOR * processes
+        ), cache, keys)
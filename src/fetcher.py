@@ -0,0 +1,158 @@
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from threading import BoundedSemaphore, Lock
+from urllib.parse import urlsplit
+
+from requests.adapters import HTTPAdapter
+
+from constants import (
+    FETCH_WINDOW_FACTOR, HOST_RATE_DEFAULT, PER_HOST_LIMIT, WORKERS_DEFAULT
+)
+from utils import bypass_cache, get_response, map_bounded
+
+THROTTLE_LOCK = Lock()
+
+
+class HostThrottle:
+    """Выдерживает паузу между запросами к одному хосту."""
+
+    def __init__(self, rate, clock=time.monotonic, sleep=time.sleep):
+        self.interval = 1 / rate if rate else 0
+        self.clock = clock
+        self.sleep = sleep
+        self._next_slot = {}
+        self._lock = Lock()
+
+    def wait(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            now = self.clock()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+        if slot > now:
+            self.sleep(slot - now)
+
+    def delay(self, url, seconds):
+        """Откладывает следующие запросы к хосту, например по Retry-After."""
+        host = urlsplit(url).netloc
+        with self._lock:
+            self._next_slot[host] = max(
+                self._next_slot.get(host, 0), self.clock() + seconds
+            )
+
+
+class ThrottledAdapter(HTTPAdapter):
+    """HTTP-адаптер с ограничением темпа запросов к хосту.
+
+    Адаптер вызывается только при промахе кеша, поэтому ответы из кеша
+    паузы не ждут.
+    """
+
+    def __init__(self, throttle, **kwargs):
+        super().__init__(**kwargs)
+        self.throttle = throttle
+
+    def send(self, request, **kwargs):
+        self.throttle.wait(request.url)
+        return super().send(request, **kwargs)
+
+
+def get_throttle(session, rate=HOST_RATE_DEFAULT, pool_size=PER_HOST_LIMIT):
+    """Общий для всех загрузчиков сессии ограничитель темпа.
+
+    Ограничитель создаётся и подключается к адаптерам один раз на
+    сессию, поэтому темп к хосту и паузы по Retry-After общие для всех
+    режимов. Адаптер заменяется, только если нужен пул соединений больше.
+    """
+    with THROTTLE_LOCK:
+        throttle = getattr(session, 'throttle', None)
+        if throttle is None:
+            throttle = session.throttle = HostThrottle(rate)
+        for prefix, adapter in list(session.adapters.items()):
+            if not isinstance(adapter, HTTPAdapter):
+                continue
+            if (
+                getattr(adapter, 'throttle', None) is throttle
+                and adapter._pool_maxsize >= pool_size
+            ):
+                continue
+            session.mount(prefix, ThrottledAdapter(
+                throttle,
+                pool_maxsize=max(pool_size, adapter._pool_maxsize)
+            ))
+        return throttle
+
+
+class BaseFetcher(ABC):
+    """Общая часть загрузчиков: сессия, лимиты и пул соединений."""
+
+    def __init__(
+        self, session, workers=WORKERS_DEFAULT, per_host=PER_HOST_LIMIT,
+        rate=HOST_RATE_DEFAULT
+    ):
+        self.session = session
+        self.workers = workers
+        self.per_host = per_host
+        # Пул keep-alive соединений на хост не меньше лимита на хост,
+        # иначе лишние соединения открываются и закрываются заново.
+        self.throttle = get_throttle(session, rate, max(per_host, workers))
+
+    def _fetch(self, url, headers=None):
+        # Условный запрос должен дойти до сервера: иначе кеш вернёт
+        # сохранённый ответ 200 вместо 304.
+        try:
+            return url, get_response(
+                self.session, url,
+                headers=bypass_cache(headers) if headers else None
+            ), None
+        except ConnectionError as error:
+            return url, None, error
+
+    @abstractmethod
+    def fetch_all(self, urls, headers=None):
+        """Возвращает (url, response, error) в порядке входных ссылок.
+
+        headers - необязательные заголовки запроса для отдельных ссылок.
+        """
+
+
+class ThreadFetcher(BaseFetcher):
+    """Параллельная загрузка страниц в пуле потоков."""
+
+    def __init__(
+        self, session, workers=WORKERS_DEFAULT, per_host=PER_HOST_LIMIT,
+        rate=HOST_RATE_DEFAULT
+    ):
+        super().__init__(session, workers, per_host, rate)
+        self._host_limits = {}
+        self._lock = Lock()
+
+    def _host_limit(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = BoundedSemaphore(self.per_host)
+            return self._host_limits[host]
+
+    def fetch(self, url, headers=None):
+        with self._host_limit(url):
+            return self._fetch(url, headers)
+
+    def fetch_all(self, urls, headers=None):
+        headers = headers or {}
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            yield from map_bounded(
+                executor,
+                lambda url: self.fetch(url, headers.get(url)),
+                urls,
+                window=FETCH_WINDOW_FACTOR * self.workers
+            )
+
+
+def get_fetcher(session, cli_args=None):
+    return ThreadFetcher(
+        session,
+        getattr(cli_args, 'workers', WORKERS_DEFAULT),
+        rate=getattr(cli_args, 'rate', HOST_RATE_DEFAULT)
+    )
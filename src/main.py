@@ -1,63 +1,152 @@
 import logging
 import re
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from copy import copy
+from functools import partial
 from urllib.parse import urljoin
 
-import requests
-import requests_cache
-from tqdm import tqdm
-
+# Здесь импортируются только лёгкие модули: requests_cache, bs4, lxml,
+# tqdm и выводы загружаются внутри режимов, которым они нужны, поэтому
+# --help и короткие режимы не платят за импорт всех зависимостей.
 from configs import configure_argument_parser, configure_logging
+from checkpoint import open_journal
 from constants import (
-    BASE_DIR, EXPECTED_STATUS, MAIN_DOC_URL,
-    MAIN_PEP_URL,
-    DOWNLOADS_DIRECTORY, LOG_MESSAGE_TEMPLATE
+    BASE_DIR, CACHE_MAX_RESPONSES, CHECKPOINT_DIR, EXPECTED_STATUS,
+    SEARCH_INDEX_DIR, SEARCH_LIMIT_DEFAULT, MAIN_DOC_URL,
+    MAIN_PEP_URL, PROCESSES_DEFAULT, WORKERS_DEFAULT,
+    DOWNLOAD_FORMATS_DEFAULT, DOWNLOADS_DIRECTORY, LOG_MESSAGE_TEMPLATE
 )
 from exceptions import NoVersionsFoundError
-from outputs import control_output
-from utils import find_tag, create_soup
+from metrics import METRICS, OUTPUT, PARSE, instrument
+from search_index import SearchIndex, find_documents
+from status_index import PepStatusIndex
 
-DOWNLOAD_SUCCESS_MESSAGE = 'Архив успешно загружен'
+DOWNLOAD_SUCCESS_MESSAGE = 'Архив успешно загружен: {}'
+ARCHIVE_NOT_FOUND_MESSAGE = 'На странице загрузок нет архива {}'
+DOWNLOAD_ERROR_MESSAGE = 'Ошибка загрузки {}: {}'
 LOG_MESSAGE_START = 'Парсер начал работать'
 LOG_MESSAGE_ARGS = 'Аргументы командной строки: {}'
 LOG_MESSAGE_CACHE_CLEARED = 'Кэш очищен'
 LOG_MESSAGE_END = 'Парсер завершил работу.'
 LOG_ERROR_MESSAGE = "Ошибка при создании soup для {}: {}"
+LOG_MESSAGE_PEP_CHANGED = 'Обновлено карточек PEP: {} из {}'
 LOG_MAIN_ERROR_MESSAGE = "Произошла ошибка: {}"
+LOG_MODE_ERROR_MESSAGE = 'Ошибка в режиме {}: {}'
+LOG_MESSAGE_SHARED = 'Общих загрузок страниц между режимами: {}'
+LOG_MESSAGE_SOUP_CACHE_STATS = (
+    'Кеш супов: попаданий {}, промахов {}, доля попаданий {:.0%}, '
+    'вытеснено {}, занято {:.1f} из {:.0f} МБ'
+)
+SERVE_ALONE_MESSAGE = 'Режим serve запускается без других режимов'
 NO_SIDEBAR_FUNCTIONS = 'На боковой панели не найдено ни одной версии'
 ERROR_MESSAGE = "Ошибка при создании soup для {}: {}"
+LOG_MESSAGE_PROFILE = 'Время по этапам:\n{}'
+STAGE_PEP_COMPARE = 'pep:compare'
+
+
+def get_journal_path(mode):
+    return BASE_DIR / CHECKPOINT_DIR / f'{mode}.jsonl'
+
+
+def get_search_index_dir():
+    return BASE_DIR / SEARCH_INDEX_DIR
+
+
+@instrument('mode:whats-new')
+def whats_new(session, cli_args=None):
+    from utils import collect_rows
 
+    return collect_rows(iter_whats_new(session, cli_args), cli_args)
+
+
+def parse_pages(session, cli_args, links, extractor=None):
+    from extractors import extract_all, get_parser
+    from scheduler import get_scheduler
+
+    return extract_all(
+        extractor or get_parser(cli_args).extract_whats_new,
+        get_scheduler(session, cli_args).crawl(links),
+        getattr(cli_args, 'processes', PROCESSES_DEFAULT),
+        getattr(session, 'parsed_cache', None)
+    )
+
+
+def get_whats_new_links(session, cli_args=None):
+    from extractors import get_parser
+    from utils import create_soup
 
-def whats_new(session):
     whats_new_url = urljoin(MAIN_DOC_URL, 'whatsnew/')
-    soup = create_soup(session, whats_new_url)
+    soup = create_soup(
+        session, whats_new_url, get_parser(cli_args).features
+    )
     section_by_python = soup.select(
         '#what-s-new-in-python div.toctree-wrapper li.toctree-l1 a'
     )
-    result = [('Ссылка на статью', 'Заголовок', 'Редактор, Автор')]
+    return [
+        urljoin(whats_new_url, version_a_tag['href'])
+        for version_a_tag in section_by_python
+    ]
+
+
+def iter_whats_new(session, cli_args=None):
+    yield ('Ссылка на статью', 'Заголовок', 'Редактор, Автор')
+    yield from iter_version_pages(session, cli_args, 'whats-new')
+
+
+@instrument('mode:whats-new-outline')
+def whats_new_outline(session, cli_args=None):
+    from utils import collect_rows
+
+    return collect_rows(
+        iter_whats_new_outline(session, cli_args), cli_args
+    )
+
+
+def iter_whats_new_outline(session, cli_args=None):
+    from extractors import get_parser
+
+    yield ('Ссылка на статью', 'Заголовок', 'Разделы', 'Модули', 'PEP')
+    yield from iter_version_pages(
+        session, cli_args, 'whats-new-outline',
+        get_parser(cli_args).extract_whats_new_outline
+    )
+
+
+def iter_version_pages(session, cli_args, mode, extractor=None):
+    """Строки страниц What's New всех версий, загруженных параллельно."""
+    from tqdm import tqdm
+
+    version_links = get_whats_new_links(session, cli_args)
     error_messages = []
-    for version_a_tag in tqdm(section_by_python, desc='Выполнение парсинга'):
-        href = version_a_tag['href']
-        version_link = urljoin(whats_new_url, href)
-        if version_a_tag:
-            continue
-        try:
-            soup = create_soup(session, version_link)
-            h1 = find_tag(soup, 'h1')
-            dl = find_tag(soup, 'dl')
-            dl_text = dl.text.replace('\n', ' ')
-            processed_data = (version_link, h1.text, dl_text)
-            result.append(processed_data)
-        except requests.RequestException as e:
-            error_messages.append(ERROR_MESSAGE.format(version_link, e))
+    with open_journal(
+        get_journal_path(mode), getattr(cli_args, 'resume', False)
+    ) as journal:
+        for version_link, page, error in tqdm(
+            journal.replay(version_links, partial(
+                parse_pages, session, cli_args, extractor=extractor
+            )),
+            total=len(version_links),
+            desc='Выполнение парсинга'
+        ):
+            if error is not None:
+                error_messages.append(
+                    ERROR_MESSAGE.format(version_link, error)
+                )
+                continue
+            yield (version_link, *page)
     for error_message in error_messages:
         logging.error(error_message)
 
-    return result
 
+@instrument('mode:latest-versions')
+def latest_versions(session, cli_args=None):
+    from extractors import get_parser
+    from utils import create_soup, find_tag
 
-def latest_versions(session):
-    soup = create_soup(session, MAIN_DOC_URL)
+    soup = create_soup(
+        session, MAIN_DOC_URL, get_parser(cli_args).features
+    )
     sidebar = find_tag(soup, 'div', attrs={'class': 'sphinxsidebarwrapper'})
     ul_tags = sidebar.find_all('ul')
 
@@ -83,89 +172,414 @@ def latest_versions(session):
     return results
 
 
-def download(session):
+@instrument('mode:download')
+def download(session, cli_args=None):
+    from downloader import DOWNLOADED, FAILED, download_files
+    from extractors import get_parser
+    from utils import create_soup
+
     downloads_url = urljoin(MAIN_DOC_URL, 'download.html')
-    soup = create_soup(session, downloads_url)
-    pdf_link = soup.select_one(
-        'div[role="main"] table.docutils a[href$="pdf-a4.zip"]'
-    )['href']
-    pdf_link = urljoin(downloads_url, pdf_link)
+    soup = create_soup(
+        session, downloads_url, get_parser(cli_args).features
+    )
     DOWNLOADS_DIR = BASE_DIR / DOWNLOADS_DIRECTORY
     DOWNLOADS_DIR.mkdir(parents=False, exist_ok=True)
-    archive_path = DOWNLOADS_DIR / pdf_link.split('/')[-1]
-    response = session.get(pdf_link)
+    downloads = []
+    error_messages = []
+    for archive_format in getattr(
+        cli_args, 'formats', DOWNLOAD_FORMATS_DEFAULT
+    ):
+        archive_tag = soup.select_one(
+            f'div[role="main"] table.docutils a[href$="{archive_format}"]'
+        )
+        if archive_tag is None:
+            error_messages.append(
+                ARCHIVE_NOT_FOUND_MESSAGE.format(archive_format)
+            )
+            continue
+        archive_link = urljoin(downloads_url, archive_tag['href'])
+        downloads.append(
+            (archive_link, DOWNLOADS_DIR / archive_link.split('/')[-1])
+        )
+    for archive_link, status, error in download_files(
+        session, downloads, getattr(cli_args, 'workers', WORKERS_DEFAULT)
+    ):
+        if status == FAILED:
+            error_messages.append(
+                DOWNLOAD_ERROR_MESSAGE.format(archive_link, error)
+            )
+        elif status == DOWNLOADED:
+            logging.info(DOWNLOAD_SUCCESS_MESSAGE.format(archive_link))
+    for error_message in error_messages:
+        logging.error(error_message)
+
+
+@instrument('mode:pep')
+def pep(session, cli_args=None):
+    if getattr(cli_args, 'incremental', False):
+        return count_pep_statuses(session, cli_args, PepStatusIndex.load())
+    return count_pep_statuses(session, cli_args)
+
 
-    with open(archive_path, 'wb') as file:
-        file.write(response.content)
-    logging.info(DOWNLOAD_SUCCESS_MESSAGE)
+def get_pep_index(session, cli_args=None):
+    from utils import SOUP_CACHE, get_response
 
+    # Индекс нужен pep, pep-metadata и index, неизменившаяся страница
+    # разбирается один раз за процесс.
+    response = get_response(session, MAIN_PEP_URL)
+    return SOUP_CACHE.get(
+        SOUP_CACHE.get_key(MAIN_PEP_URL, 'pep-index', response.content),
+        len(response.content),
+        parse_pep_index, response.content, cli_args
+    )
+
+
+def parse_pep_index(content, cli_args=None):
+    from extractors import get_parser
+
+    with METRICS.timer(PARSE):
+        return get_parser(cli_args).extract_pep_index(content)
+
+
+def get_pep_links(pep_index):
+    return [
+        urljoin(MAIN_PEP_URL, href) for _, _, href in pep_index.values()
+    ]
 
-def pep(session):
-    soup = create_soup(session, MAIN_PEP_URL)
-    main_tag = find_tag(
-        soup, 'section', {'id': 'numerical-index'}
+
+def parse_pep_cards(
+    session, cli_args, status_index, links, extractor=None
+):
+    from extractors import extract_all, get_parser
+    from scheduler import get_scheduler
+
+    fetched = get_scheduler(session, cli_args).crawl(
+        links,
+        status_index.conditional_headers(links) if status_index else None
     )
-    peps_row = main_tag.find_all('tr')
+    if status_index is not None:
+        fetched = status_index.track(fetched)
+    return extract_all(
+        extractor or get_parser(cli_args).extract_pep_card,
+        fetched,
+        getattr(cli_args, 'processes', PROCESSES_DEFAULT),
+        getattr(session, 'parsed_cache', None)
+    )
+
+
+def reconcile_statuses(pep_index, card_statuses, status_index=None):
+    """Сверяет статусы карточек со статусами индекса по номеру PEP."""
     count_status_in_cards = defaultdict(int)
     log_messages = []
-
-    for pep_row in tqdm(peps_row[1:], desc="Обработка строк PEP"):
-        pep_href_tag = pep_row.a['href']
-        pep_link = urljoin(MAIN_PEP_URL, pep_href_tag)
-        try:
-            soup = create_soup(session, pep_link)
-            main_card_tag = find_tag(
-                soup, 'section', {'id': 'pep-content'}
-            )
-            main_card = find_tag(
-                main_card_tag, 'dl', {'class': 'rfc2822 field-list simple'}
-            )
-        except requests.RequestException as e:
-            log_messages.append(LOG_ERROR_MESSAGE.format(pep_link, e))
+    for number, (_, table_status, _) in pep_index.items():
+        if number not in card_statuses:
             continue
-        for row, tag in enumerate(main_card):
-            if tag.name == 'dt' and tag.text == 'Status:':
+        pep_link, card_status = card_statuses[number]
+        if status_index is not None:
+            status_index.update(pep_link, card_status, table_status)
+        count_status_in_cards[card_status] += 1
+        if card_status not in EXPECTED_STATUS[table_status]:
+            log_messages.append(LOG_MESSAGE_TEMPLATE.format(
+                pep_link, card_status, ', '.join(
+                    EXPECTED_STATUS[table_status]
+                )
+            ))
+    return count_status_in_cards, log_messages
+
+
+def count_pep_statuses(session, cli_args=None, status_index=None):
+    from tqdm import tqdm
+
+    pep_index = get_pep_index(session, cli_args)
+    pep_links = get_pep_links(pep_index)
+    parse_cards = partial(
+        parse_pep_cards, session, cli_args, status_index
+    )
+    card_statuses = {}
+    error_messages = []
+
+    with open_journal(
+        get_journal_path('pep'), getattr(cli_args, 'resume', False)
+    ) as journal:
+        for number, (pep_link, card, error) in tqdm(
+            zip(pep_index, journal.replay(pep_links, parse_cards)),
+            total=len(pep_index),
+            desc="Обработка строк PEP"
+        ):
+            if error is not None:
+                error_messages.append(
+                    LOG_ERROR_MESSAGE.format(pep_link, error)
+                )
                 continue
-            card_status = tag.next_sibling.next_sibling.string
-            count_status_in_cards[card_status] += 1
-            if len(peps_row[row + 1].td.text) != 1:
-                table_status = peps_row[row + 1].td.text[1:]
-                if card_status[0] != table_status:
-                    log_messages.append(LOG_MESSAGE_TEMPLATE.format(
-                        pep_link, card_status, ', '.join(
-                            EXPECTED_STATUS[table_status]
-                        )
-                    ))
+            card_statuses[number] = pep_link, (
+                status_index.get_status(pep_link) if card is None
+                else card[0]
+            )
+    with METRICS.timer(STAGE_PEP_COMPARE):
+        count_status_in_cards, log_messages = reconcile_statuses(
+            pep_index, card_statuses, status_index
+        )
+    for error_message in error_messages:
+        logging.error(error_message)
+    for log_message in log_messages:
+        logging.info(log_message)
+    if status_index is not None:
+        status_index.save()
+        logging.info(LOG_MESSAGE_PEP_CHANGED.format(
+            status_index.changed, len(pep_index)
+        ))
+
     return [
         ('Статус', 'Количество'),
         *count_status_in_cards.items(),
-        ('Всего', len(peps_row) - 1),
+        ('Всего', len(pep_index)),
     ]
 
 
+@instrument('mode:pep-metadata')
+def pep_metadata(session, cli_args=None):
+    from utils import collect_rows
+
+    return collect_rows(iter_pep_metadata(session, cli_args), cli_args)
+
+
+def iter_pep_metadata(session, cli_args=None):
+    from tqdm import tqdm
+
+    from extractors import PepMetadata, get_parser
+
+    pep_index = get_pep_index(session, cli_args)
+    pep_links = get_pep_links(pep_index)
+    parse_cards = partial(
+        parse_pep_cards, session, cli_args, None,
+        extractor=get_parser(cli_args).extract_pep_metadata
+    )
+    yield (
+        'Номер', 'Заголовок', 'Автор', 'Статус', 'Тип', 'Создан',
+        'Версия Python', 'История обсуждения', 'Заменяет', 'Заменён на'
+    )
+    error_messages = []
+    with open_journal(
+        get_journal_path('pep-metadata'), getattr(cli_args, 'resume', False)
+    ) as journal:
+        for number, (pep_link, card, error) in tqdm(
+            zip(pep_index, journal.replay(pep_links, parse_cards)),
+            total=len(pep_index),
+            desc='Извлечение метаданных PEP'
+        ):
+            if error is not None:
+                error_messages.append(
+                    LOG_ERROR_MESSAGE.format(pep_link, error)
+                )
+                continue
+            yield PepMetadata(number, *card)
+    for error_message in error_messages:
+        logging.error(error_message)
+
+
+@instrument('mode:index')
+def index(session, cli_args=None):
+    from tqdm import tqdm
+
+    from extractors import get_parser
+
+    links = [
+        *get_whats_new_links(session, cli_args),
+        *get_pep_links(get_pep_index(session, cli_args)),
+    ]
+    search_index = SearchIndex.load(get_search_index_dir())
+    error_messages = []
+    for link, record, error in tqdm(
+        parse_pages(
+            session, cli_args, links,
+            extractor=get_parser(cli_args).extract_sections
+        ),
+        total=len(links),
+        desc='Индексация страниц'
+    ):
+        if error is not None:
+            error_messages.append(ERROR_MESSAGE.format(link, error))
+            continue
+        search_index.update(link, record)
+    search_index.retain(links)
+    documents, terms = search_index.save()
+    for error_message in error_messages:
+        logging.error(error_message)
+    return [
+        ('Показатель', 'Значение'),
+        ('Страниц', len(search_index.pages)),
+        ('Разделов', documents),
+        ('Терминов', terms),
+        ('Обновлено страниц', search_index.changed),
+    ]
+
+
+@instrument('mode:search')
+def search(session, cli_args=None):
+    return [
+        ('Ссылка', 'Раздел'),
+        *find_documents(
+            getattr(cli_args, 'query', ''),
+            getattr(cli_args, 'limit', SEARCH_LIMIT_DEFAULT),
+            get_search_index_dir()
+        ),
+    ]
+
+
+def save_caches(session, cli_args=None):
+    from caching import (
+        CACHE_STATS, LOG_MESSAGE_CACHE_STATS, LOG_MESSAGE_PARSED_CACHE_STATS,
+        trim_cache
+    )
+    from utils import SOUP_CACHE
+
+    removed = trim_cache(session.cache, getattr(
+        cli_args, 'cache_max_responses', CACHE_MAX_RESPONSES
+    ))
+    logging.info(LOG_MESSAGE_CACHE_STATS.format(
+        CACHE_STATS.hits, CACHE_STATS.misses, CACHE_STATS.hit_rate,
+        removed
+    ))
+    logging.info(LOG_MESSAGE_SOUP_CACHE_STATS.format(
+        SOUP_CACHE.hits, SOUP_CACHE.misses, SOUP_CACHE.hit_rate,
+        SOUP_CACHE.evicted, SOUP_CACHE.size / 2 ** 20,
+        SOUP_CACHE.max_size / 2 ** 20
+    ))
+    parsed_cache = getattr(session, 'parsed_cache', None)
+    if parsed_cache is not None:
+        evicted = parsed_cache.save()
+        logging.info(LOG_MESSAGE_PARSED_CACHE_STATS.format(
+            parsed_cache.hits, parsed_cache.misses, evicted
+        ))
+
+
+def serve(session, cli_args=None):
+    from server import ResultStore, serve as serve_api
+
+    serve_api(ResultStore(
+        session, cli_args,
+        {mode: MODE_TO_FUNCTION[mode] for mode in SERVED_MODES},
+        {'search': search},
+        on_refresh=partial(save_caches, session, cli_args)
+    ), cli_args)
+
+
 MODE_TO_FUNCTION = {
     'whats-new': whats_new,
+    'whats-new-outline': whats_new_outline,
     'latest-versions': latest_versions,
     'download': download,
     'pep': pep,
+    'pep-metadata': pep_metadata,
+    'index': index,
+    'search': search,
+    'serve': serve,
 }
+# Режимы, результаты которых сервер держит в памяти.
+SERVED_MODES = (
+    'whats-new', 'whats-new-outline', 'latest-versions', 'pep',
+    'pep-metadata'
+)
+ALL_MODES = 'all'
+# Режимы, которые запускает all: все, кроме поиска и сервера.
+BATCH_MODES = (
+    'whats-new', 'whats-new-outline', 'latest-versions', 'download', 'pep',
+    'pep-metadata', 'index'
+)
+# Режимы, которые run_modes выполняет по одному после параллельных:
+# загрузка архивов не делит сессию и сеть с обходом страниц.
+SEQUENTIAL_MODES = ('download',)
+
+
+def get_modes(names):
+    """Режимы запуска в порядке перечисления, без повторов."""
+    return list(dict.fromkeys(
+        mode for name in names
+        for mode in (BATCH_MODES if name == ALL_MODES else (name,))
+    ))
+
+
+def run_mode(session, cli_args, mode, collect=False):
+    """Выполняет режим, возвращает (результаты, аргументы режима)."""
+    mode_args = copy(cli_args)
+    mode_args.mode = mode
+    results = MODE_TO_FUNCTION[mode](session, mode_args)
+    if collect and results is not None:
+        results = list(results)
+    return results, mode_args
+
+
+def output_results(results, cli_args):
+    if results is None:
+        return
+    from outputs import control_output
+
+    with METRICS.timer(OUTPUT):
+        control_output(results, cli_args)
+
+
+def run_modes(session, cli_args, modes):
+    """Выполняет режимы параллельно на общей сессии.
+
+    Одновременные запросы одной страницы разными режимами выполняются
+    один раз, общие супы и индекс PEP берутся из SOUP_CACHE.
+    Результаты выводятся в порядке режимов. Режимы SEQUENTIAL_MODES
+    выполняются по одному после остальных.
+    """
+    from utils import SingleFlight
+
+    session.inflight = SingleFlight()
+    parallel = [mode for mode in modes if mode not in SEQUENTIAL_MODES]
+    with ThreadPoolExecutor(max_workers=max(len(parallel), 1)) as executor:
+        jobs = [
+            (mode, executor.submit(
+                run_mode, session, cli_args, mode, collect=True
+            ).result)
+            for mode in parallel
+        ] + [
+            (mode, partial(run_mode, session, cli_args, mode))
+            for mode in modes if mode in SEQUENTIAL_MODES
+        ]
+        for mode, get_results in jobs:
+            try:
+                output_results(*get_results())
+            except Exception as error:
+                logging.error(LOG_MODE_ERROR_MESSAGE.format(mode, error))
+    logging.info(LOG_MESSAGE_SHARED.format(session.inflight.shared))
 
 
 def main():
+    arg_parser = configure_argument_parser([*MODE_TO_FUNCTION, ALL_MODES])
+    args = arg_parser.parse_args()
+    modes = get_modes(args.mode)
+    if 'serve' in modes and len(modes) > 1:
+        arg_parser.error(SERVE_ALONE_MESSAGE)
     try:
         configure_logging()
         logging.info(LOG_MESSAGE_START)
-        arg_parser = configure_argument_parser(MODE_TO_FUNCTION.keys())
-        args = arg_parser.parse_args()
         logging.info(LOG_MESSAGE_ARGS.format(args))
-        session = requests_cache.CachedSession()
+        METRICS.enabled = args.profile or args.profile_json is not None
+        from caching import create_session
+        from mirror import attach_mirror
+        from utils import SOUP_CACHE
+
+        SOUP_CACHE.max_size = args.soup_cache_mb * 2 ** 20
+        session = attach_mirror(create_session(args), args)
+        parsed_cache = getattr(session, 'parsed_cache', None)
         if args.clear_cache:
             session.cache.clear()
+            if parsed_cache is not None:
+                parsed_cache.clear()
             logging.info(LOG_MESSAGE_CACHE_CLEARED)
-        parser_mode = args.mode
-        results = MODE_TO_FUNCTION[parser_mode](session)
-        if results is not None:
-            control_output(results, parser_mode, args)
+        if len(modes) == 1:
+            output_results(*run_mode(session, args, modes[0]))
+        else:
+            run_modes(session, args, modes)
+        save_caches(session, args)
+        if METRICS.enabled:
+            logging.info(LOG_MESSAGE_PROFILE.format(METRICS.report()))
+        if args.profile_json is not None:
+            METRICS.dump(args.profile_json)
     except Exception as e:
         logging.error(LOG_MAIN_ERROR_MESSAGE.format(e))
 
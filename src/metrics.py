@@ -0,0 +1,124 @@
+import json
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from threading import Lock
+
+# Верхние границы корзин гистограммы задержек, мс.
+BUCKETS_MS = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000, 5000)
+FETCH_NETWORK = 'fetch:network'
+FETCH_CACHE = 'fetch:cache'
+PARSE = 'parse'
+OUTPUT = 'output'
+REPORT_FIELDS = (
+    'Этап', 'Вызовов', 'Всего, с', 'Среднее, мс', 'p50, мс', 'p95, мс',
+    'Макс, мс'
+)
+
+
+class StageStats:
+    """Количество вызовов и гистограмма задержек одного этапа."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.max = 0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.buckets[bisect_left(BUCKETS_MS, seconds * 1000)] += 1
+
+    def percentile(self, share):
+        """Верхняя граница корзины, в которую попадает доля вызовов."""
+        threshold = share * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS_MS, self.buckets):
+            seen += count
+            if seen >= threshold:
+                return bound
+        return self.max * 1000
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'total_s': self.total,
+            'max_ms': self.max * 1000,
+            'buckets_ms': dict(zip(
+                [*map(str, BUCKETS_MS), 'inf'], self.buckets
+            )),
+        }
+
+
+class Metrics:
+    """Сбор времени по этапам; выключенный сбор почти ничего не стоит."""
+
+    def __init__(self):
+        self.enabled = False
+        self.stages = {}
+        self._lock = Lock()
+
+    def record(self, stage, seconds):
+        if not self.enabled:
+            return
+        with self._lock:
+            if stage not in self.stages:
+                self.stages[stage] = StageStats()
+            self.stages[stage].add(seconds)
+
+    @contextmanager
+    def timer(self, stage):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def report(self):
+        from prettytable import PrettyTable
+
+        table = PrettyTable()
+        table.field_names = REPORT_FIELDS
+        table.align = 'l'
+        for stage, stats in sorted(self.stages.items()):
+            table.add_row((
+                stage,
+                stats.count,
+                f'{stats.total:.3f}',
+                f'{stats.total / stats.count * 1000:.2f}',
+                f'≤{stats.percentile(0.5):g}',
+                f'≤{stats.percentile(0.95):g}',
+                f'{stats.max * 1000:.2f}',
+            ))
+        return table.get_string()
+
+    def dump(self, path):
+        stages = {
+            stage: stats.as_dict() for stage, stats in self.stages.items()
+        }
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(stages, file, ensure_ascii=False, indent=2)
+
+
+METRICS = Metrics()
+
+
+def instrument(stage):
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not METRICS.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                METRICS.record(stage, time.perf_counter() - start)
+        return wrapper
+    return decorator
@@ -0,0 +1,195 @@
+import hashlib
+import io
+import json
+import mmap
+import shutil
+from http import HTTPStatus
+from threading import Lock
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3 import HTTPResponse
+
+from checkpoint import iter_jsonl
+from constants import BASE_DIR, DOWNLOAD_CHUNK_SIZE, MIRROR_DIR
+
+PACK_FILE = 'pages.pack'
+INDEX_FILE = 'pages.idx'
+MIRRORED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+NOT_MIRRORED_MESSAGE = 'Страницы нет в локальной копии: {}'
+
+
+class PageMirror:
+    """Локальная копия страниц: файл тел ответов и индекс смещений.
+
+    Оба файла только дописываются: тело ответа добавляется в конец
+    pages.pack, а в pages.idx - строка JSON со ссылкой, смещением,
+    длиной, хешем тела и заголовками. Для чтения pages.pack отображается
+    в память, тела отдаются срезами без чтения всего файла.
+    """
+
+    def __init__(self, directory, entries=None):
+        self.directory = directory
+        self.entries = entries or {}
+        self._lock = Lock()
+        self._pack = None
+        self._view = None
+
+    @classmethod
+    def load(cls, directory=BASE_DIR / MIRROR_DIR):
+        entries = {
+            entry['u']: entry for entry in iter_jsonl(directory / INDEX_FILE)
+        }
+        return cls(directory, entries)
+
+    def _append(self, url, digest, headers, write_body):
+        self.directory.mkdir(exist_ok=True)
+        with self._lock:
+            if self.entries.get(url, {}).get('d') == digest:
+                return
+            with open(self.directory / PACK_FILE, 'ab') as pack:
+                offset = pack.tell()
+                write_body(pack)
+                length = pack.tell() - offset
+            entry = {
+                'u': url, 'o': offset, 'n': length, 'd': digest,
+                'h': {
+                    name: headers[name] for name in MIRRORED_HEADERS
+                    if headers.get(name) is not None
+                },
+            }
+            with open(
+                self.directory / INDEX_FILE, 'a', encoding='utf-8'
+            ) as index:
+                index.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            self.entries[url] = entry
+
+    def add(self, url, content, headers):
+        self._append(
+            url, hashlib.sha256(content).hexdigest(), headers,
+            lambda pack: pack.write(content)
+        )
+
+    def add_file(self, url, path, headers, digest):
+        """Добавляет загруженный файл, не читая его в память целиком.
+
+        digest - sha256 файла, посчитанный при загрузке.
+        """
+        def write_body(pack):
+            with open(path, 'rb') as file:
+                shutil.copyfileobj(file, pack, DOWNLOAD_CHUNK_SIZE)
+
+        self._append(url, digest, headers, write_body)
+
+    def record(self, response, *args, stream=False, **kwargs):
+        """Хук сессии: сохраняет успешные ответы на GET-запросы."""
+        if (
+            stream or response.request.method != 'GET'
+            or response.status_code != HTTPStatus.OK
+        ):
+            return response
+        self.add(response.url, response.content, response.headers)
+        return response
+
+    def get(self, url):
+        """Возвращает (тело, заголовки) или None, если страницы нет."""
+        entry = self.entries.get(url)
+        if entry is None:
+            return None
+        end = entry['o'] + entry['n']
+        with self._lock:
+            if self._view is None or len(self._view) < end:
+                # Файл вырос после отображения - отображаем заново.
+                self.close()
+                self._pack = open(self.directory / PACK_FILE, 'rb')
+                self._view = mmap.mmap(
+                    self._pack.fileno(), 0, access=mmap.ACCESS_READ
+                )
+            return self._view[entry['o']:end], entry['h']
+
+    def close(self):
+        if self._view is not None:
+            self._view.close()
+            self._pack.close()
+            self._view = self._pack = None
+
+
+def slice_range(content, range_header):
+    """(статус, тело, Content-Range) для заголовка Range вида bytes=N-M."""
+    first, _, last = (
+        (range_header or '').removeprefix('bytes=').partition('-')
+    )
+    if not first.isdigit():
+        return HTTPStatus.OK, content, None
+    start = int(first)
+    if start >= len(content):
+        return HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE, b'', None
+    end = min(int(last) + 1 if last.isdigit() else len(content), len(content))
+    return (
+        HTTPStatus.PARTIAL_CONTENT, content[start:end],
+        f'bytes {start}-{end - 1}/{len(content)}'
+    )
+
+
+class MirrorAdapter(BaseAdapter):
+    """Транспорт requests, отвечающий страницами из локальной копии."""
+
+    def __init__(self, mirror):
+        super().__init__()
+        self.mirror = mirror
+
+    def send(self, request, stream=False, **kwargs):
+        page = self.mirror.get(request.url)
+        if page is None:
+            # Не ConnectionError: повтор запроса страницу не добавит.
+            raise requests.RequestException(
+                NOT_MIRRORED_MESSAGE.format(request.url), request=request
+            )
+        content, headers = page
+        response = requests.Response()
+        response.headers = CaseInsensitiveDict(headers)
+        response.status_code, content, content_range = slice_range(
+            content, request.headers.get('Range')
+        )
+        if content_range is not None:
+            response.headers['Content-Range'] = content_range
+        etag = request.headers.get('If-None-Match')
+        if etag is not None and etag == headers.get('ETag'):
+            response.status_code, content = HTTPStatus.NOT_MODIFIED, b''
+        response.headers['Content-Length'] = str(len(content))
+        response.raw = HTTPResponse(
+            body=io.BytesIO(b'' if request.method == 'HEAD' else content),
+            headers=dict(response.headers),
+            status=response.status_code,
+            preload_content=False,
+            request_method=request.method,
+            request_url=request.url,
+        )
+        response.reason = HTTPStatus(response.status_code).phrase
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+    def close(self):
+        self.mirror.close()
+
+
+def attach_mirror(session, cli_args=None):
+    """Подключает к сессии запись в локальную копию или чтение из неё."""
+    offline = getattr(cli_args, 'offline', False)
+    record = getattr(cli_args, 'mirror_record', False)
+    if not offline and not record:
+        return session
+    mirror = PageMirror.load(
+        getattr(cli_args, 'mirror_dir', None) or BASE_DIR / MIRROR_DIR
+    )
+    if offline:
+        adapter = MirrorAdapter(mirror)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+    if record:
+        session.hooks['response'].append(mirror.record)
+        session.mirror = mirror
+    return session
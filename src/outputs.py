@@ -1,16 +1,18 @@
 import csv
 import datetime as dt
+import json
 import logging
-
-from prettytable import PrettyTable
-
+from itertools import islice
 
 from constants import (
-    BASE_DIR, DATETIME_FORMAT, RESULTS_DIR, PRETTY_OUTPUT, FILE_OUTPUT
+    BASE_DIR, DATETIME_FORMAT, RESULTS_DIR, PRETTY_OUTPUT, FILE_OUTPUT,
+    JSONL_OUTPUT, PARQUET_BATCH_SIZE, PARQUET_OUTPUT
 )
+from exceptions import MissingDependencyError
 
 LOG_MESSAGE_FILE_SAVED = 'Файл с результатами был сохранён: {}'
 LOG_MESSAGE_RESULTS_SAVED = 'Данные сохранены в {}'
+PYARROW_MISSING_MESSAGE = 'Для вывода в parquet установите пакет pyarrow'
 
 
 def control_output(input_data, cli_args):
@@ -19,31 +21,82 @@ def control_output(input_data, cli_args):
 
 def default_output(input_data, cli_args):
     for row in input_data:
-        print(*row)
+        print(*row, flush=True)
 
 
 def pretty_output(input_data, cli_args):
+    from prettytable import PrettyTable
+
+    rows = iter(input_data)
     table = PrettyTable()
-    table.field_names = input_data[0]
+    table.field_names = next(rows)
     table.align = 'l'
-    table.add_rows(input_data[1:])
+    for row in rows:
+        table.add_row(row)
     print(table)
 
 
-def file_output(input_data, cli_args):
+def get_file_path(cli_args, extension):
     results_dir = BASE_DIR / RESULTS_DIR
-    results_dir.mkdir()
+    results_dir.mkdir(exist_ok=True)
     parser_mode = cli_args.mode
     formatted_dt = dt.datetime.now().strftime(DATETIME_FORMAT)
-    file_name = f'{parser_mode}_{formatted_dt}.csv'
-    file_path = f'{results_dir}/{file_name}'
+    file_name = f'{parser_mode}_{formatted_dt}.{extension}'
+    return f'{results_dir}/{file_name}'
+
+
+def file_output(input_data, cli_args):
+    file_path = get_file_path(cli_args, 'csv')
     with open(file_path, 'w', encoding='utf-8') as file:
         csv.writer(file, dialect=csv.excel).writerows(input_data)
     logging.info(LOG_MESSAGE_FILE_SAVED.format(file_path))
 
 
+def jsonl_output(input_data, cli_args):
+    rows = iter(input_data)
+    field_names = next(rows)
+    file_path = get_file_path(cli_args, 'jsonl')
+    with open(file_path, 'a', encoding='utf-8') as file:
+        for row in rows:
+            file.write(json.dumps(
+                dict(zip(field_names, row)), ensure_ascii=False
+            ))
+            file.write('\n')
+    logging.info(LOG_MESSAGE_FILE_SAVED.format(file_path))
+
+
+def parquet_output(input_data, cli_args):
+    # pyarrow импортируется долго, поэтому только для этого вывода.
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise MissingDependencyError(PYARROW_MISSING_MESSAGE)
+    rows = iter(input_data)
+    field_names = next(rows)
+    file_path = get_file_path(cli_args, 'parquet')
+    writer = None
+    # Типы колонок определяются по первой пачке строк.
+    for batch in iter(lambda: list(islice(rows, PARQUET_BATCH_SIZE)), []):
+        table = pyarrow.Table.from_pylist(
+            [dict(zip(field_names, row)) for row in batch],
+            schema=writer.schema if writer is not None else None
+        )
+        if writer is None:
+            writer = pyarrow.parquet.ParquetWriter(file_path, table.schema)
+        writer.write_table(table)
+    if writer is None:
+        writer = pyarrow.parquet.ParquetWriter(file_path, pyarrow.schema(
+            [(name, pyarrow.string()) for name in field_names]
+        ))
+    writer.close()
+    logging.info(LOG_MESSAGE_FILE_SAVED.format(file_path))
+
+
 OUTPUT_TYPES = {
     PRETTY_OUTPUT: pretty_output,
     FILE_OUTPUT: file_output,
+    JSONL_OUTPUT: jsonl_output,
+    PARQUET_OUTPUT: parquet_output,
     None: default_output,
 }
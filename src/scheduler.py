@@ -0,0 +1,145 @@
+import heapq
+import logging
+import random
+import time
+from collections import Counter
+from http import HTTPStatus
+
+import requests
+
+from constants import (
+    BACKOFF_BASE, BACKOFF_MAX, RETRIES_DEFAULT, RETRY_BUDGET_MIN,
+    RETRY_BUDGET_RATIO
+)
+from fetcher import get_fetcher
+
+TRANSIENT_STATUSES = frozenset((
+    HTTPStatus.TOO_MANY_REQUESTS,
+    HTTPStatus.INTERNAL_SERVER_ERROR,
+    HTTPStatus.BAD_GATEWAY,
+    HTTPStatus.SERVICE_UNAVAILABLE,
+    HTTPStatus.GATEWAY_TIMEOUT,
+))
+RETRIES_EXHAUSTED_MESSAGE = 'Сервер отвечает {} после попыток: {}'
+LOG_MESSAGE_RETRY = 'Попытка {} для {} через {:.1f} с: {}'
+LOG_MESSAGE_BUDGET_EXHAUSTED = (
+    'Бюджет повторов исчерпан, остальные ошибки не повторяются'
+)
+
+
+class CrawlScheduler:
+    """Очередь обхода ссылок поверх загрузчика.
+
+    Убирает повторяющиеся ссылки, повторяет временные ошибки с
+    экспоненциальной задержкой в пределах бюджета и возвращает
+    (url, response, error) в порядке входных ссылок.
+    """
+
+    def __init__(
+        self, fetcher, retries=RETRIES_DEFAULT, backoff=BACKOFF_BASE,
+        clock=time.monotonic, sleep=time.sleep
+    ):
+        self.fetcher = fetcher
+        self.retries = retries
+        self.backoff = backoff
+        self.clock = clock
+        self.sleep = sleep
+
+    @staticmethod
+    def is_transient(response, error):
+        # Повторяются только сетевые сбои и таймауты, остальные ошибки
+        # запроса при повторе не исчезнут.
+        if error is not None:
+            return isinstance(
+                error.__cause__, (requests.ConnectionError, requests.Timeout)
+            )
+        return response.status_code in TRANSIENT_STATUSES
+
+    def retry_delay(self, attempt, response=None):
+        # Полуслучайная задержка, чтобы повторы не приходили пачкой.
+        delay = self.backoff * 2 ** (attempt - 1) * random.uniform(0.5, 1)
+        retry_after = (
+            response.headers.get('Retry-After', '')
+            if response is not None else ''
+        )
+        if retry_after.isdigit():
+            delay = max(delay, int(retry_after))
+        return min(delay, BACKOFF_MAX)
+
+    def _next_round(self, frontier):
+        if not frontier:
+            return []
+        wait = frontier[0][0] - self.clock()
+        if wait > 0:
+            self.sleep(wait)
+        now = self.clock()
+        ready = []
+        while frontier and frontier[0][0] <= now:
+            ready.append(heapq.heappop(frontier)[1])
+        return ready
+
+    def _result(self, url, response, error, attempts):
+        if error is None and response.status_code in TRANSIENT_STATUSES:
+            return url, None, ConnectionError(
+                RETRIES_EXHAUSTED_MESSAGE.format(
+                    response.status_code, attempts
+                )
+            )
+        return url, response, error
+
+    def _schedule(self, frontier, url, response, error, attempts):
+        delay = self.retry_delay(attempts[url], response)
+        if response is not None:
+            # Сервер просит подождать - ждут все запросы к этому хосту.
+            self.fetcher.throttle.delay(url, delay)
+        attempts[url] += 1
+        logging.info(LOG_MESSAGE_RETRY.format(
+            attempts[url], url, delay, error or response.status_code
+        ))
+        heapq.heappush(frontier, (self.clock() + delay, url))
+
+    def crawl(self, urls, headers=None):
+        urls = list(urls)
+        pending = Counter(urls)
+        unique = list(pending)
+        budget = max(RETRY_BUDGET_MIN, int(len(unique) * RETRY_BUDGET_RATIO))
+        budget_logged = False
+        attempts = dict.fromkeys(unique, 1)
+        results = {}
+        frontier = []
+        position = 0
+        ready = unique
+        while ready:
+            for url, response, error in self.fetcher.fetch_all(
+                ready, headers
+            ):
+                if self.is_transient(response, error) and (
+                    attempts[url] <= self.retries
+                ):
+                    if budget:
+                        budget -= 1
+                        self._schedule(
+                            frontier, url, response, error, attempts
+                        )
+                        continue
+                    if not budget_logged:
+                        logging.warning(LOG_MESSAGE_BUDGET_EXHAUSTED)
+                        budget_logged = True
+                results[url] = self._result(
+                    url, response, error, attempts[url]
+                )
+                while position < len(urls) and urls[position] in results:
+                    next_url = urls[position]
+                    yield results[next_url]
+                    position += 1
+                    pending[next_url] -= 1
+                    if not pending[next_url]:
+                        del results[next_url]
+            ready = self._next_round(frontier)
+
+
+def get_scheduler(session, cli_args=None):
+    return CrawlScheduler(
+        get_fetcher(session, cli_args),
+        getattr(cli_args, 'retries', RETRIES_DEFAULT)
+    )
@@ -0,0 +1,144 @@
+import hashlib
+import json
+import mmap
+import re
+from array import array
+from collections import defaultdict
+
+from constants import BASE_DIR, SEARCH_INDEX_DIR, SEARCH_LIMIT_DEFAULT
+from exceptions import SearchIndexNotFoundError
+
+# Числа индексируются любой длины: запросы вроде «PEP 8» ищут по номеру.
+TOKEN_PATTERN = re.compile(r'\d+|\w{2,}')
+PAGES_FILE = 'pages.json'
+DOCUMENTS_FILE = 'documents.json'
+LEXICON_FILE = 'lexicon.json'
+POSTINGS_FILE = 'postings.bin'
+# Номера документов в postings.bin - беззнаковые 32-битные числа.
+POSTING_TYPE = 'I'
+TITLE_SEPARATOR = ' › '
+INDEX_NOT_FOUND_MESSAGE = 'Поисковый индекс не найден, запустите режим index'
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def get_digest(record):
+    # Со сменой разбиения на термины страницы переиндексируются.
+    return hashlib.sha256(json.dumps(
+        [TOKEN_PATTERN.pattern, record], ensure_ascii=False
+    ).encode()).hexdigest()
+
+
+def write_atomic(path, data):
+    temp_path = path.with_suffix('.tmp')
+    temp_path.write_bytes(data)
+    temp_path.replace(path)
+
+
+class SearchIndex:
+    """Обратный индекс разделов страниц: термин -> номера документов.
+
+    Документ - раздел страницы. Для каждой страницы хранятся хеш
+    извлечённой записи и термины разделов, поэтому при обновлении
+    заново разбиваются на термины только изменившиеся страницы.
+    Термины с номерами документов лежат в postings.bin одним массивом,
+    который при поиске отображается в память.
+    """
+
+    def __init__(self, directory, pages=None):
+        self.directory = directory
+        self.pages = pages or {}
+        self.changed = 0
+
+    @classmethod
+    def load(cls, directory=BASE_DIR / SEARCH_INDEX_DIR):
+        path = directory / PAGES_FILE
+        if not path.exists():
+            return cls(directory)
+        with open(path, encoding='utf-8') as file:
+            return cls(directory, json.load(file))
+
+    def update(self, url, record):
+        """Обновляет страницу, если извлечённая запись изменилась."""
+        digest = get_digest(record)
+        if self.pages.get(url, {}).get('digest') == digest:
+            return
+        title, sections = record
+        self.pages[url] = {
+            'digest': digest,
+            'sections': [
+                [
+                    anchor,
+                    TITLE_SEPARATOR.join(filter(None, (title, heading))),
+                    sorted(set(tokenize(f'{heading} {text}')))
+                ]
+                for anchor, heading, text in sections
+            ],
+        }
+        self.changed += 1
+
+    def retain(self, urls):
+        """Удаляет страницы, на которые больше нет ссылок."""
+        for url in set(self.pages) - set(urls):
+            del self.pages[url]
+            self.changed += 1
+
+    def save(self):
+        documents = []
+        postings = defaultdict(list)
+        for url in sorted(self.pages):
+            for anchor, title, tokens in self.pages[url]['sections']:
+                for token in tokens:
+                    postings[token].append(len(documents))
+                documents.append((f'{url}#{anchor}', title))
+        lexicon = {}
+        data = array(POSTING_TYPE)
+        for token in sorted(postings):
+            lexicon[token] = (len(data), len(postings[token]))
+            data.extend(postings[token])
+        self.directory.mkdir(exist_ok=True)
+        write_atomic(self.directory / POSTINGS_FILE, data.tobytes())
+        for name, content in (
+            (DOCUMENTS_FILE, documents),
+            (LEXICON_FILE, lexicon),
+            (PAGES_FILE, self.pages),
+        ):
+            write_atomic(self.directory / name, json.dumps(
+                content, ensure_ascii=False, separators=(',', ':')
+            ).encode())
+        return len(documents), len(lexicon)
+
+
+def find_documents(
+    query, limit=SEARCH_LIMIT_DEFAULT, directory=BASE_DIR / SEARCH_INDEX_DIR
+):
+    """(ссылка, заголовок) разделов со всеми терминами запроса."""
+    if not (directory / LEXICON_FILE).exists():
+        raise SearchIndexNotFoundError(INDEX_NOT_FOUND_MESSAGE)
+    tokens = set(tokenize(query))
+    if not tokens:
+        return []
+    with open(directory / LEXICON_FILE, encoding='utf-8') as file:
+        lexicon = json.load(file)
+    if not tokens <= lexicon.keys():
+        return []
+    with open(directory / POSTINGS_FILE, 'rb') as file, mmap.mmap(
+        file.fileno(), 0, access=mmap.ACCESS_READ
+    ) as postings:
+        view = memoryview(postings).cast(POSTING_TYPE)
+        try:
+            matches = None
+            # Пересечение начинается с самого редкого термина.
+            for token in sorted(tokens, key=lambda token: lexicon[token][1]):
+                offset, count = lexicon[token]
+                found = set(view[offset:offset + count])
+                matches = found if matches is None else matches & found
+                if not matches:
+                    return []
+        finally:
+            view.release()
+    with open(directory / DOCUMENTS_FILE, encoding='utf-8') as file:
+        documents = json.load(file)
+    return [tuple(documents[number]) for number in sorted(matches)[:limit]]
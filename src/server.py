@@ -0,0 +1,200 @@
+import datetime as dt
+import json
+import logging
+import threading
+import time
+from argparse import ArgumentTypeError
+from copy import copy
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from socketserver import ThreadingUnixStreamServer
+from urllib.parse import parse_qsl, urlsplit
+
+from configs import positive_int
+from constants import SERVE_HOST, SERVE_PORT, SERVE_REFRESH
+
+LOG_MESSAGE_SERVING = 'Сервер слушает {}'
+LOG_MESSAGE_REFRESHED = 'Режим {} обновлён за {:.2f} с'
+LOG_MESSAGE_REFRESH_ERROR = 'Ошибка обновления режима {}: {}'
+LOG_MESSAGE_STOPPED = 'Сервер остановлен'
+UNKNOWN_MODE_MESSAGE = 'Неизвестный режим: {}'
+QUERY_ERROR_MESSAGE = 'Некорректный параметр запроса: {}'
+
+
+class ResultStore:
+    """Результаты режимов в памяти, общие для всех запросов сервера.
+
+    Режимы считаются на одной тёплой сессии: при первом запросе и затем
+    фоновым потоком раз в refresh секунд. Запросы читают готовый снимок
+    и не ждут обновления. queries - режимы с параметрами запроса
+    (например, search), они не кешируются и выполняются на каждый запрос.
+    """
+
+    def __init__(
+        self, session, cli_args, modes, queries=None, on_refresh=None
+    ):
+        self.session = session
+        self.cli_args = cli_args
+        self.modes = modes
+        self.queries = queries or {}
+        self.on_refresh = on_refresh
+        self.results = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def _compute(self, mode):
+        start = time.monotonic()
+        rows = [
+            tuple(row)
+            for row in self.modes[mode](self.session, self.cli_args)
+        ]
+        self.results[mode] = (
+            dt.datetime.now().isoformat(timespec='seconds'), rows
+        )
+        logging.info(
+            LOG_MESSAGE_REFRESHED.format(mode, time.monotonic() - start)
+        )
+        if self.on_refresh is not None:
+            self.on_refresh()
+        return self.results[mode]
+
+    def refresh(self, mode):
+        with self._lock:
+            return self._compute(mode)
+
+    def refresh_all(self):
+        for mode in self.modes:
+            if self._stopped.is_set():
+                return
+            try:
+                self.refresh(mode)
+            except Exception as error:
+                logging.error(LOG_MESSAGE_REFRESH_ERROR.format(mode, error))
+
+    def get(self, mode):
+        """(время обновления, строки) режима, считает его при промахе."""
+        result = self.results.get(mode)
+        if result is not None:
+            return result
+        with self._lock:
+            if mode in self.results:
+                return self.results[mode]
+            return self._compute(mode)
+
+    def query(self, mode, params):
+        if mode in self.modes:
+            return self.get(mode)
+        cli_args = copy(self.cli_args)
+        cli_args.query = params.get('q', '')
+        if 'limit' in params:
+            cli_args.limit = positive_int(params['limit'])
+        rows = self.queries[mode](self.session, cli_args)
+        return (
+            dt.datetime.now().isoformat(timespec='seconds'),
+            [tuple(row) for row in rows]
+        )
+
+    def run(self, interval=SERVE_REFRESH):
+        while not self._stopped.is_set():
+            self.refresh_all()
+            if self._stopped.wait(interval):
+                return
+
+    def stop(self):
+        self._stopped.set()
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    """GET /<режим>: строки режима в JSON, GET /: режимы и время обновления.
+
+    Для режимов с запросом параметры передаются в строке запроса:
+    /search?q=pattern+matching&limit=5.
+    """
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        mode = url.path.strip('/')
+        store = self.server.store
+        if not mode:
+            return self.send_json(HTTPStatus.OK, {
+                'modes': {
+                    name: store.results.get(name, (None,))[0]
+                    for name in store.modes
+                },
+                'queries': list(store.queries),
+            })
+        if mode not in store.modes and mode not in store.queries:
+            return self.send_json(HTTPStatus.NOT_FOUND, {
+                'error': UNKNOWN_MODE_MESSAGE.format(mode)
+            })
+        try:
+            updated, rows = store.query(mode, dict(parse_qsl(url.query)))
+        except (ArgumentTypeError, ValueError) as error:
+            return self.send_json(HTTPStatus.BAD_REQUEST, {
+                'error': QUERY_ERROR_MESSAGE.format(error)
+            })
+        except Exception as error:
+            return self.send_json(
+                HTTPStatus.INTERNAL_SERVER_ERROR, {'error': str(error)}
+            )
+        field_names, *rows = rows
+        self.send_json(HTTPStatus.OK, {
+            'mode': mode,
+            'updated': updated,
+            'rows': [dict(zip(field_names, row)) for row in rows],
+        })
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self):
+        # У клиента Unix-сокета нет адреса.
+        return str(self.client_address[0]) if self.client_address else '-'
+
+    def log_message(self, format, *args):
+        logging.debug(format, *args)
+
+
+def create_server(store, cli_args=None):
+    """HTTP-сервер на порту или на Unix-сокете из cli_args.socket."""
+    socket_path = getattr(cli_args, 'socket', None)
+    if socket_path is not None:
+        socket_path.unlink(missing_ok=True)
+        server = ThreadingUnixStreamServer(str(socket_path), ApiHandler)
+    else:
+        server = ThreadingHTTPServer(
+            (SERVE_HOST, getattr(cli_args, 'port', SERVE_PORT)), ApiHandler
+        )
+    server.daemon_threads = True
+    server.store = store
+    return server
+
+
+def serve(store, cli_args=None):
+    """Обслуживает запросы, пока процесс не прервут."""
+    server = create_server(store, cli_args)
+    interval = getattr(cli_args, 'refresh', SERVE_REFRESH)
+    refresher = threading.Thread(
+        target=store.run, args=(interval,), daemon=True
+    )
+    if interval:
+        refresher.start()
+    logging.info(LOG_MESSAGE_SERVING.format(server.server_address))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        store.stop()
+        server.server_close()
+        if refresher.is_alive():
+            refresher.join()
+        socket_path = getattr(cli_args, 'socket', None)
+        if socket_path is not None:
+            socket_path.unlink(missing_ok=True)
+        logging.info(LOG_MESSAGE_STOPPED)
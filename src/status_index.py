@@ -0,0 +1,68 @@
+import json
+import re
+from http import HTTPStatus
+
+from constants import BASE_DIR, PEP_STATUS_INDEX
+
+PEP_NUMBER_PATTERN = re.compile(r'pep-(?P<number>\d+)')
+
+
+class PepStatusIndex:
+    """Локальный индекс карточек PEP: валидаторы HTTP и статусы."""
+
+    def __init__(self, path, entries=None):
+        self.path = path
+        self.entries = entries or {}
+        self.changed = 0
+        self._validators = {}
+
+    @classmethod
+    def load(cls, path=BASE_DIR / PEP_STATUS_INDEX):
+        if not path.exists():
+            return cls(path)
+        with open(path, encoding='utf-8') as file:
+            return cls(path, json.load(file))
+
+    def save(self):
+        temp_path = self.path.with_suffix('.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump(self.entries, file, ensure_ascii=False, indent=1)
+        temp_path.replace(self.path)
+
+    @staticmethod
+    def get_number(url):
+        return str(int(PEP_NUMBER_PATTERN.search(url).group('number')))
+
+    def conditional_headers(self, urls):
+        headers = {}
+        for url in urls:
+            entry = self.entries.get(self.get_number(url), {})
+            url_headers = {}
+            if entry.get('etag'):
+                url_headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                url_headers['If-Modified-Since'] = entry['last_modified']
+            if url_headers and 'status' in entry:
+                headers[url] = url_headers
+        return headers
+
+    def track(self, fetched):
+        """Запоминает валидаторы ответов, пропуская результаты загрузчика."""
+        for url, response, error in fetched:
+            if response is not None and response.status_code == HTTPStatus.OK:
+                self._validators[url] = (
+                    response.headers.get('ETag'),
+                    response.headers.get('Last-Modified'),
+                )
+            yield url, response, error
+
+    def get_status(self, url):
+        return self.entries[self.get_number(url)]['status']
+
+    def update(self, url, status, table_status):
+        entry = self.entries.setdefault(self.get_number(url), {})
+        if url in self._validators:
+            self.changed += 1
+            entry['etag'], entry['last_modified'] = self._validators.pop(url)
+        entry['status'] = status
+        entry['table_status'] = table_status
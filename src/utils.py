@@ -1,22 +1,184 @@
+import hashlib
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from threading import Lock
+
 from requests import RequestException
 
 from bs4 import BeautifulSoup
 
+from caching import CACHE_STATS
+from constants import SOUP_CACHE_MAX_MB, SOUP_SIZE_FACTOR
 from exceptions import ParserFindTagException
+from metrics import FETCH_CACHE, FETCH_NETWORK, METRICS, PARSE, instrument
 
 ERROR_MESSAGE_GET_RESPONSE = 'Нет ответа от страницы {}, Ошибка соединения: {}'
 ERROR_MESSAGE_FIND_TAG = 'Не найден тег {} {}'
+# no-store запрещает requests_cache и читать ответ из кеша, и сохранять его.
+CACHE_BYPASS_HEADERS = {'Cache-Control': 'no-store'}
+
+
+class SingleFlight:
+    """Один вызов на ключ для всех потоков.
+
+    Пока первый поток выполняет вызов, остальные потоки с тем же ключом
+    ждут и получают его результат или исключение. После вызова ключ
+    освобождается.
+    """
+
+    def __init__(self):
+        self.shared = 0
+        self._calls = {}
+        self._lock = Lock()
+
+    def do(self, key, func, *args, **kwargs):
+        with self._lock:
+            call = self._calls.get(key)
+            owner = call is None
+            if owner:
+                call = self._calls[key] = Future()
+            else:
+                self.shared += 1
+        if owner:
+            try:
+                call.set_result(func(*args, **kwargs))
+            except BaseException as error:
+                call.set_exception(error)
+            finally:
+                with self._lock:
+                    del self._calls[key]
+        return call.result()
+
+
+class SoupCache:
+    """LRU разобранных страниц в памяти процесса с ограничением размера.
+
+    Ключ - ссылка, вид разбора и хеш тела ответа, поэтому изменившаяся
+    страница разбирается заново. Размер записи оценивает вызывающий код
+    по размеру страницы. Одновременные запросы одного ключа ждут один
+    разбор. Значения из кеша общие, изменять их нельзя.
+    """
+
+    def __init__(self, max_size=SOUP_CACHE_MAX_MB * 2 ** 20):
+        self.max_size = max_size
+        self.size = 0
+        self.misses = 0
+        self.evicted = 0
+        self._hits = 0
+        self._entries = OrderedDict()
+        self._flight = SingleFlight()
+        self._lock = Lock()
+
+    @staticmethod
+    def get_key(url, kind, content):
+        return url, kind, hashlib.sha256(content).hexdigest()
+
+    @property
+    def hits(self):
+        return self._hits + self._flight.shared
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0
+
+    def _lookup(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+            return entry
+
+    def _load(self, key, size, func, *args):
+        entry = self._lookup(key)
+        if entry is not None:
+            return entry[0]
+        value = func(*args)
+        with self._lock:
+            self.misses += 1
+            if size <= self.max_size:
+                self._entries[key] = value, size
+                self.size += size
+            while self.size > self.max_size:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.size -= evicted_size
+                self.evicted += 1
+        return value
+
+    def get(self, key, size, func, *args):
+        """Значение по ключу, при промахе - func(*args)."""
+        entry = self._lookup(key)
+        if entry is not None:
+            return entry[0]
+        return self._flight.do(key, self._load, key, size, func, *args)
 
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
 
-def get_response(session, url, encoding='utf-8'):
+
+SOUP_CACHE = SoupCache()
+
+
+def get_response(session, url, encoding='utf-8', **kwargs):
+    inflight = getattr(session, 'inflight', None)
+    # Потоковые ответы читаются один раз, поэтому не разделяются.
+    if inflight is None or not set(kwargs) <= {'headers'}:
+        return _get_response(session, url, encoding, **kwargs)
+    return inflight.do(
+        (url, encoding, tuple(sorted((kwargs.get('headers') or {}).items()))),
+        _get_response, session, url, encoding, **kwargs
+    )
+
+
+def _get_response(session, url, encoding='utf-8', **kwargs):
+    start = time.perf_counter()
     try:
-        response = session.get(url)
+        response = session.get(url, **kwargs)
+        CACHE_STATS.record(response)
+        METRICS.record(
+            FETCH_CACHE if getattr(response, 'from_cache', False)
+            else FETCH_NETWORK,
+            time.perf_counter() - start
+        )
         response.encoding = encoding
         return response
     except RequestException as error:
-        raise ConnectionError(ERROR_MESSAGE_GET_RESPONSE.format(url, error))
+        raise ConnectionError(
+            ERROR_MESSAGE_GET_RESPONSE.format(url, error)
+        ) from error
+
+
+def bypass_cache(headers=None):
+    """Заголовки запроса мимо кеша ответов: без чтения и без записи.
 
+    В отличие от session.cache_disabled() действуют на один запрос,
+    а не на всю сессию во всех потоках.
+    """
+    return {**(headers or {}), **CACHE_BYPASS_HEADERS}
 
+
+def map_bounded(executor, func, *iterables, window):
+    """Как executor.map, но держит в работе не больше window задач."""
+    pending = deque()
+    for args in zip(*iterables):
+        if len(pending) >= window:
+            yield pending.popleft().result()
+        pending.append(executor.submit(func, *args))
+    while pending:
+        yield pending.popleft().result()
+
+
+def collect_rows(rows, cli_args=None):
+    if getattr(cli_args, 'stream', False):
+        return rows
+    return list(rows)
+
+
+@instrument('find_tag')
 def find_tag(soup, tag, attrs=None):
     search_tag = soup.find(tag, attrs=attrs if attrs else {})
     if search_tag is None:
@@ -27,4 +189,14 @@ def find_tag(soup, tag, attrs=None):
 
 
 def create_soup(session, url, parse_format='lxml'):
-    return BeautifulSoup(get_response(session, url).text, parse_format)
+    response = get_response(session, url)
+    return SOUP_CACHE.get(
+        SOUP_CACHE.get_key(url, parse_format, response.content),
+        len(response.content) * SOUP_SIZE_FACTOR,
+        parse_soup, response.text, parse_format
+    )
+
+
+def parse_soup(text, parse_format='lxml'):
+    with METRICS.timer(PARSE):
+        return BeautifulSoup(text, parse_format)
@@ -0,0 +1,120 @@
+"""Воспроизведение docs.python.org и peps.python.org из сохранённых страниц.
+
+Карточки PEP строятся из pep-0008.html для каждой строки сохранённого
+числового индекса, страницы What's New - из whatsnew-3.11.html для
+каждой версии из сохранённого списка.
+"""
+import hashlib
+import re
+from pathlib import Path
+
+import requests_mock
+
+PAGES_DIR = Path(__file__).parent / 'pages'
+MAIN_DOC_URL = 'https://docs.python.org/3/'
+MAIN_PEP_URL = 'https://peps.python.org/'
+ARCHIVE_SIZE = 2 * 1024 * 1024
+
+INDEX_ROW_PATTERN = re.compile(
+    r'<abbr title="\w*">(?P<letters>\w*)</abbr></td>\s*'
+    r'<td><a class="pep reference internal" href="(?P<href>pep-\d+/)" '
+    r'title="(?P<title>[^"]*)">'
+)
+WHATS_NEW_LINK_PATTERN = re.compile(r'href="(?P<version>[\d.]+)\.html"')
+ARCHIVE_PATTERN = re.compile(r'href="(?P<href>archives/[^"]+)"')
+CARD_TITLE = 'PEP 8 – Style Guide for Python Code'
+CARD_STATUS = '>Active</abbr></dd>'
+WHATS_NEW_VERSION = '3.11'
+# Каждая MISMATCH_EVERY-я карточка расходится со статусом в индексе.
+MISMATCH_EVERY = 97
+CARD_STATUSES = {
+    'A': 'Active',
+    'D': 'Deferred',
+    'F': 'Final',
+    'P': 'Provisional',
+    'R': 'Rejected',
+    'S': 'Superseded',
+    'W': 'Withdrawn',
+    '': 'Draft',
+}
+
+
+def read_page(name):
+    return (PAGES_DIR / name).read_text(encoding='utf-8')
+
+
+def pep_rows():
+    """Возвращает (href, буквы типа и статуса, заголовок) строк индекса."""
+    return [
+        (match['href'], match['letters'], match['title'])
+        for match in INDEX_ROW_PATTERN.finditer(read_page('pep-index.html'))
+    ]
+
+
+def card_status(position, letters):
+    if position % MISMATCH_EVERY == MISMATCH_EVERY - 1:
+        return 'Draft' if letters[1:] else 'Final'
+    return CARD_STATUSES[letters[1:]]
+
+
+def pep_cards():
+    template = read_page('pep-0008.html')
+    rows = pep_rows()
+    # Строка категорий повторяет первую строку числового индекса.
+    return {
+        MAIN_PEP_URL + href: template.replace(CARD_TITLE, title).replace(
+            CARD_STATUS, f'>{card_status(position, letters)}</abbr></dd>'
+        )
+        for position, (href, letters, title) in enumerate(rows[1:])
+    }
+
+
+def whats_new_pages():
+    template = read_page('whatsnew-3.11.html')
+    return {
+        f'{MAIN_DOC_URL}whatsnew/{version}.html': template.replace(
+            WHATS_NEW_VERSION, version
+        )
+        for version in WHATS_NEW_LINK_PATTERN.findall(
+            read_page('whatsnew-index.html')
+        )
+    }
+
+
+def archives():
+    content = bytes(range(256)) * (ARCHIVE_SIZE // 256)
+    headers = {
+        'Content-Length': str(len(content)),
+        'ETag': f'"{hashlib.md5(content).hexdigest()}"',
+    }
+    return {
+        MAIN_DOC_URL + href: (content, headers)
+        for href in ARCHIVE_PATTERN.findall(read_page('download.html'))
+    }
+
+
+def corpus_pages():
+    return {
+        MAIN_DOC_URL: read_page('docs-index.html'),
+        MAIN_DOC_URL + 'whatsnew/': read_page('whatsnew-index.html'),
+        MAIN_DOC_URL + 'download.html': read_page('download.html'),
+        MAIN_PEP_URL: read_page('pep-index.html'),
+        **whats_new_pages(),
+        **pep_cards(),
+    }
+
+
+def mount_corpus(session):
+    """Подключает к сессии адаптер, отвечающий страницами корпуса."""
+    adapter = requests_mock.Adapter()
+    for url, page in corpus_pages().items():
+        adapter.register_uri(
+            'GET', url, content=page.encode('utf-8'),
+            headers={'Content-Type': 'text/html; charset=utf-8'}
+        )
+    for url, (content, headers) in archives().items():
+        adapter.register_uri('GET', url, content=content, headers=headers)
+        adapter.register_uri('HEAD', url, headers=headers)
+    session.mount('https://', adapter)
+    session.corpus_adapter = adapter
+    return session
@@ -0,0 +1,114 @@
+from argparse import Namespace
+from datetime import timedelta
+
+try:
+    from src import caching
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `caching.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `caching.py`'
+from conftest import mount_mock_adapter
+
+
+def lifetime(response):
+    return round((response.expires - response.created_at).total_seconds())
+
+
+def memory_session():
+    return mount_mock_adapter(
+        caching.create_session(Namespace(cache_backend='memory'))
+    )
+
+
+def test_urls_expire_after():
+    session = memory_session()
+    card = session.get('mock://peps.python.org/pep-0008/')
+    index = session.get('mock://peps.python.org/')
+    session.get('mock://docs.python.org/3/archives/python-docs-pdf-a4.zip')
+    assert lifetime(card) == timedelta(days=7).total_seconds(), (
+        'Карточки PEP должны храниться в кеше неделю'
+    )
+    assert lifetime(index) == timedelta(hours=1).total_seconds(), (
+        'Индексные страницы должны храниться в кеше час'
+    )
+    assert len(session.cache.responses) == 2, (
+        'Архивы документации не должны попадать в кеш'
+    )
+
+
+def test_trim_cache():
+    session = memory_session()
+    for number in range(5):
+        session.get(f'mock://peps.python.org/pep-{number:04d}/')
+    assert caching.trim_cache(session.cache, max_responses=2) == 3
+    assert sorted(
+        response.url for response in session.cache.responses.values()
+    ) == [
+        'mock://peps.python.org/pep-0003/',
+        'mock://peps.python.org/pep-0004/',
+    ], 'Из кеша должны удаляться самые старые ответы'
+
+
+def test_trim_sqlite_cache_by_expiry(tmp_path, monkeypatch):
+    monkeypatch.setattr(caching, 'BASE_DIR', tmp_path)
+    session = mount_mock_adapter(caching.create_session(Namespace(
+        cache_backend='sqlite', parsed_cache=False, index_ttl=60
+    )))
+    cards = [
+        f'mock://peps.python.org/pep-{number:04d}/' for number in range(3)
+    ]
+    for url in cards:
+        session.get(url)
+    session.get('mock://peps.python.org/')
+    vacuums = []
+    monkeypatch.setattr(
+        session.cache.responses, 'vacuum', lambda: vacuums.append(1)
+    )
+    assert caching.trim_cache(session.cache, max_responses=3) == 1
+    assert not vacuums, 'После мелкой чистки файл кеша не должен сжиматься'
+    assert sorted(
+        response.url for response in session.cache.responses.values()
+    ) == cards, 'Первыми должны вытесняться ответы, которые раньше устареют'
+    index = session.get('mock://peps.python.org/')
+    assert lifetime(index) == 60, (
+        'Время жизни индексных страниц задаётся аргументом --index-ttl'
+    )
+    caching.trim_cache(session.cache, max_responses=2, vacuum_min_removed=2)
+    assert len(vacuums) == 1, 'После крупной чистки файл кеша сжимается'
+
+
+def test_cache_stats():
+    session = memory_session()
+    stats = caching.CacheStats()
+    for _ in range(3):
+        stats.record(session.get('mock://peps.python.org/pep-0008/'))
+    assert (stats.hits, stats.misses) == (2, 1)
+    assert round(stats.hit_rate, 2) == 0.67
+
+
+def test_parsed_cache_lru(tmp_path):
+    cache = caching.ParsedCache(tmp_path / 'parsed.sqlite', max_entries=2)
+    keys = [
+        cache.get_key('extract_pep_card:v1', f'mock://pep-{number}', b'<p>')
+        for number in range(3)
+    ]
+    for number, key in enumerate(keys):
+        cache.set(key, ('Active', f'PEP {number}'))
+    assert cache.get(keys[0]) == ('Active', 'PEP 0')
+    assert cache.save() == 1
+    reopened = caching.ParsedCache(tmp_path / 'parsed.sqlite')
+    assert reopened.get(keys[1]) is None, (
+        'Из кеша разобранных страниц должны вытесняться давно не '
+        'использованные записи'
+    )
+    assert reopened.get(keys[0]) == ('Active', 'PEP 0')
+
+
+def test_parsed_cache_key_depends_on_body_and_version():
+    key = caching.ParsedCache.get_key('extract_pep_card:v1', 'mock://a', b'1')
+    assert key != caching.ParsedCache.get_key(
+        'extract_pep_card:v1', 'mock://a', b'2'
+    ), 'Изменившаяся страница должна разбираться заново'
+    assert key != caching.ParsedCache.get_key(
+        'extract_pep_card:v2', 'mock://a', b'1'
+    ), 'Новая версия кода извлечения должна разбирать страницы заново'
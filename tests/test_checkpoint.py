@@ -0,0 +1,76 @@
+from argparse import Namespace
+from pathlib import Path
+
+import pytest
+from requests_cache import CachedSession
+try:
+    from src import checkpoint
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `checkpoint.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `checkpoint.py`'
+from src import main
+from tests.fixture_data.corpus import mount_corpus
+
+
+def test_journal_survives_torn_line(tmp_path):
+    path = tmp_path / 'pep.jsonl'
+    journal = checkpoint.CrawlJournal(path, flush_every=1)
+    journal.append('https://peps.python.org/pep-0008/', ('Active', 'PEP 8'))
+    journal.close()
+    with open(path, 'a', encoding='utf-8') as file:
+        file.write('{"u": "https://peps.python.org/pep-0')
+    loaded = checkpoint.CrawlJournal.load(path)
+    assert loaded.completed == {
+        'https://peps.python.org/pep-0008/': ('Active', 'PEP 8')
+    }, 'Оборванная последняя строка журнала должна пропускаться'
+
+
+def test_replay_skips_completed(tmp_path):
+    journal = checkpoint.CrawlJournal(
+        tmp_path / 'pep.jsonl', {'b': ('done',)}
+    )
+    requested = []
+
+    def process(urls):
+        requested.extend(urls)
+        return ((url, (url.upper(),), None) for url in urls)
+
+    got = list(journal.replay(['a', 'b', 'c', 'a'], process))
+    assert requested == ['a', 'c', 'a'], (
+        'Обработанные ссылки не должны загружаться повторно'
+    )
+    assert got == [
+        ('a', ('A',), None), ('b', ('done',), None),
+        ('c', ('C',), None), ('a', ('A',), None),
+    ]
+
+
+@pytest.mark.parametrize('processes', [1, 2])
+def test_whats_new_resumes_after_interrupt(monkeypatch, tmp_path, processes):
+    monkeypatch.setattr(main, 'BASE_DIR', Path(tmp_path))
+    session = mount_corpus(CachedSession(backend='memory'))
+    cli_args = Namespace(workers=4, processes=processes, resume=False)
+    rows = main.iter_whats_new(session, cli_args)
+    completed = [next(rows) for _ in range(8)][1:]
+    rows.close()
+    journal_path = main.get_journal_path('whats-new')
+    assert journal_path.exists(), (
+        'После прерывания обхода журнал должен остаться на диске'
+    )
+
+    session.cache.clear()
+    session.corpus_adapter.reset()
+    cli_args.resume = True
+    got = main.whats_new(session, cli_args)
+    fetched = {
+        request.url for request in session.corpus_adapter.request_history
+    }
+    assert got[1:len(completed) + 1] == completed
+    assert not fetched & {link for link, _, _ in completed}, (
+        'С флагом --resume обработанные страницы не должны загружаться'
+    )
+    assert len(got) == 22
+    assert not journal_path.exists(), (
+        'После успешного обхода журнал должен удаляться'
+    )
@@ -29,7 +29,7 @@ def test_configs_file():
     ),
     (
         argparse._StoreAction, ['-o', '--output'], 'output',
-        ('pretty', 'file'),
+        ('pretty', 'file', 'jsonl', 'parquet'),
         'Дополнительные способы вывода данных'
     ),
 ])
@@ -64,3 +64,13 @@ def test_configure_argument_parser(
     assert got_action.help == help_str, (
         f'Укажите help-строку cli аргумента {got_action.dest}'
     )
+
+
+def test_missing_redis_is_reported(monkeypatch, capsys):
+    monkeypatch.setattr(configs, 'find_spec', lambda name: None)
+    parser = configs.configure_argument_parser(['pep'])
+    with pytest.raises(SystemExit):
+        parser.parse_args(['pep', '--cache-backend', 'redis'])
+    assert configs.REDIS_MISSING_MESSAGE in capsys.readouterr().err, (
+        'Без пакета redis должна выводиться понятная ошибка аргументов'
+    )
@@ -0,0 +1,157 @@
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+try:
+    from src import downloader
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `downloader.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `downloader.py`'
+
+ARCHIVE_URL = 'mock://docs.python.org/3/archives/python-docs-pdf-a4.zip'
+ARCHIVE = bytes(range(256)) * 1000
+
+
+def serve_archive(request, context):
+    context.headers['Content-Length'] = str(len(ARCHIVE))
+    requested = request.headers.get('Range')
+    if requested is None:
+        return ARCHIVE
+    start = int(requested[len('bytes='):-1])
+    context.status_code = 206
+    context.headers['Content-Range'] = (
+        f'bytes {start}-{len(ARCHIVE) - 1}/{len(ARCHIVE)}'
+    )
+    context.headers['Content-Length'] = str(len(ARCHIVE) - start)
+    return ARCHIVE[start:]
+
+
+@pytest.fixture
+def archive_session(mock_session):
+    mock_session.mock_adapter.register_uri(
+        'GET', ARCHIVE_URL, content=serve_archive
+    )
+    return mock_session
+
+
+def test_download_file(archive_session, tmp_path):
+    path = tmp_path / 'python-docs-pdf-a4.zip'
+    downloader.download_file(
+        archive_session, ARCHIVE_URL, path, chunk_size=4096,
+        sha256=hashlib.sha256(ARCHIVE).hexdigest()
+    )
+    assert path.read_bytes() == ARCHIVE, 'Архив должен загружаться целиком'
+    assert not (tmp_path / 'python-docs-pdf-a4.zip.part').exists()
+    assert (tmp_path / 'python-docs-pdf-a4.zip.sha256').read_text() == (
+        hashlib.sha256(ARCHIVE).hexdigest()
+    )
+    assert not len(archive_session.cache.responses), (
+        'Архивы не должны попадать в кеш ответов'
+    )
+
+
+def test_download_keeps_cache_for_other_requests(archive_session, tmp_path):
+    page_url = 'mock://docs.python.org/3/'
+
+    def serve_while_fetching(request, context):
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            executor.submit(archive_session.get, page_url).result()
+        return serve_archive(request, context)
+
+    archive_session.mock_adapter.register_uri(
+        'GET', ARCHIVE_URL, content=serve_while_fetching
+    )
+    downloader.download_file(
+        archive_session, ARCHIVE_URL, tmp_path / 'python-docs-pdf-a4.zip'
+    )
+    assert archive_session.get(page_url).from_cache, (
+        'Загрузка архива не должна отключать кеш для других запросов'
+    )
+    assert not archive_session.cache.contains(url=ARCHIVE_URL)
+
+
+def test_download_file_resume(archive_session, tmp_path):
+    path = tmp_path / 'python-docs-pdf-a4.zip'
+    (tmp_path / 'python-docs-pdf-a4.zip.part').write_bytes(ARCHIVE[:100000])
+    downloader.download_file(archive_session, ARCHIVE_URL, path)
+    history = archive_session.mock_adapter.request_history
+    assert history[-1].headers['Range'] == 'bytes=100000-', (
+        'Недокачанный файл должен догружаться через заголовок Range'
+    )
+    assert path.read_bytes() == ARCHIVE
+
+
+def test_download_file_checksum_mismatch(archive_session, tmp_path):
+    path = tmp_path / 'python-docs-pdf-a4.zip'
+    with pytest.raises(downloader.DownloadError):
+        downloader.download_file(
+            archive_session, ARCHIVE_URL, path, sha256='0' * 64
+        )
+    assert not path.exists()
+
+
+def test_download_files_skips_up_to_date(archive_session, tmp_path):
+    other_url = ARCHIVE_URL.replace('pdf-a4.zip', 'html.zip')
+    archive_session.mock_adapter.register_uri(
+        'GET', other_url, content=serve_archive
+    )
+    archive_session.mock_adapter.register_uri(
+        'HEAD', ARCHIVE_URL, headers={'Content-Length': str(len(ARCHIVE))}
+    )
+    archive_session.mock_adapter.register_uri(
+        'HEAD', other_url, headers={'Content-Length': '1'}
+    )
+    ready_path = tmp_path / 'python-docs-pdf-a4.zip'
+    ready_path.write_bytes(ARCHIVE)
+    got = downloader.download_files(archive_session, [
+        (ARCHIVE_URL, ready_path),
+        (other_url, tmp_path / 'python-docs-html.zip'),
+    ], workers=2)
+    assert got == [
+        (ARCHIVE_URL, downloader.UP_TO_DATE, None),
+        (other_url, downloader.DOWNLOADED, None),
+    ], 'Загрузка должна сообщать, был ли архив скачан или пропущен'
+    assert [
+        request.method
+        for request in archive_session.mock_adapter.request_history
+        if request.url == ARCHIVE_URL
+    ] == ['HEAD'], 'Уже загруженный архив не должен загружаться повторно'
+    assert (tmp_path / 'python-docs-html.zip').read_bytes() == ARCHIVE
+
+
+def test_corrupted_archive_is_rejected(archive_session, tmp_path):
+    archive_session.mock_adapter.register_uri(
+        'HEAD', ARCHIVE_URL, headers={'Content-Length': str(len(ARCHIVE))}
+    )
+    path = tmp_path / 'python-docs-pdf-a4.zip'
+    path.write_bytes(b'\xff' + ARCHIVE[1:])
+    (tmp_path / 'python-docs-pdf-a4.zip.sha256').write_text(
+        hashlib.sha256(ARCHIVE).hexdigest()
+    )
+    assert not downloader.is_up_to_date(archive_session, ARCHIVE_URL, path), (
+        'Файл с неверной контрольной суммой не считается загруженным'
+    )
+    got = downloader.download_files(archive_session, [(ARCHIVE_URL, path)])
+    assert got == [(ARCHIVE_URL, downloader.DOWNLOADED, None)]
+    assert path.read_bytes() == ARCHIVE, 'Испорченный архив перекачивается'
+
+
+def test_corrupted_part_is_rejected(mock_session, tmp_path):
+    def serve_with_etag(request, context):
+        context.headers['ETag'] = '"v1"'
+        return serve_archive(request, context)
+
+    mock_session.mock_adapter.register_uri(
+        'GET', ARCHIVE_URL, content=serve_with_etag
+    )
+    path = tmp_path / 'python-docs-pdf-a4.zip'
+    (tmp_path / 'python-docs-pdf-a4.zip.etag').write_text('"v1"')
+    (tmp_path / 'python-docs-pdf-a4.zip.sha256').write_text(
+        hashlib.sha256(ARCHIVE).hexdigest()
+    )
+    (tmp_path / 'python-docs-pdf-a4.zip.part').write_bytes(b'\0' * 1000)
+    with pytest.raises(downloader.DownloadError):
+        downloader.download_file(mock_session, ARCHIVE_URL, path)
+    assert not path.exists(), 'Испорченная загрузка не должна сохраняться'
+    assert not (tmp_path / 'python-docs-pdf-a4.zip.part').exists()
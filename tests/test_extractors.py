@@ -0,0 +1,161 @@
+from pathlib import Path
+
+import pytest
+try:
+    from src import extractors
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `extractors.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `extractors.py`'
+
+PAGES_DIR = Path(__file__).parent / 'fixture_data' / 'pages'
+PEP_CARD = (
+    '<section id="pep-content"><h1>PEP 8 – Style Guide</h1>'
+    '<dl class="rfc2822 field-list simple">'
+    '<dt class="field-odd">Author<span class="colon">:</span></dt>'
+    '<dd class="field-odd">Guido van Rossum,\nBarry Warsaw</dd>'
+    '<dt class="field-even">Status<span class="colon">:</span></dt>'
+    '<dd class="field-even"><abbr title="Accepted">Active</abbr></dd>'
+    '</dl></section>'
+).encode()
+WHATS_NEW_PAGE = (
+    '<h1>What’s New In Python 3.11</h1>'
+    '<dl class="field-list simple"><dt>Editor</dt>\n<dd>Pablo</dd></dl>'
+).encode()
+
+
+class Page:
+    def __init__(self, content, status_code=200):
+        self.content = content
+        self.status_code = status_code
+
+
+def test_extract_pep_card():
+    assert extractors.extract_pep_card(PEP_CARD) == (
+        'Active', 'PEP 8 – Style Guide', 'Guido van Rossum, Barry Warsaw'
+    ), 'Проверьте извлечение статуса, заголовка и автора из карточки PEP'
+
+
+def test_extract_whats_new():
+    assert extractors.extract_whats_new(WHATS_NEW_PAGE) == (
+        'What’s New In Python 3.11', 'Editor Pablo'
+    )
+
+
+def test_extract_whats_new_outline():
+    page = (
+        '<meta charset="utf-8"><h1>What’s New In Python 3.11¶</h1>'
+        '<section id="new-features"><h2>New Features¶</h2>'
+        '<a href="https://peps.python.org/pep-0678/">PEP 678</a>'
+        '<a href="https://peps.python.org/pep-0654/">PEP 654</a>'
+        '<section id="asyncio"><h3>asyncio</h3>'
+        '<code class="xref py py-mod">asyncio</code>'
+        '<code class="xref py py-mod">tomllib</code>'
+        '<code class="xref py py-mod">asyncio</code>'
+        '<a href="https://peps.python.org/pep-0654/">PEP 654</a>'
+        '</section></section>'
+        '<section id="removed"><h2>Removed</h2></section>'
+    ).encode()
+    assert extractors.extract_whats_new_outline(page) == (
+        'What’s New In Python 3.11', 'New Features; Removed',
+        'asyncio, tomllib', '654, 678'
+    ), 'Проверьте извлечение разделов, модулей и номеров PEP'
+
+
+@pytest.mark.parametrize('page, extractor, expected', [
+    (
+        'pep-0008.html', extractors.extract_pep_card,
+        (
+            'Active', 'PEP 8 – Style Guide for Python Code',
+            'Guido van Rossum <guido at python.org>, '
+            'Barry Warsaw <barry at python.org>, '
+            'Alyssa Coghlan <ncoghlan at gmail.com>'
+        )
+    ),
+    (
+        'pep-0008.html', extractors.extract_pep_metadata,
+        (
+            'PEP 8 – Style Guide for Python Code',
+            'Guido van Rossum <guido at python.org>, '
+            'Barry Warsaw <barry at python.org>, '
+            'Alyssa Coghlan <ncoghlan at gmail.com>',
+            'Active', 'Process', '05-Jul-2001', '',
+            '05-Jul-2001, 01-Aug-2013', '', ''
+        )
+    ),
+    (
+        'whatsnew-3.11.html', extractors.extract_whats_new,
+        ('What’s New In Python 3.11¶', ' Editor: Pablo Galindo Salgado  ')
+    ),
+])
+def test_extract_fixture_pages(page, extractor, expected):
+    assert extractor((PAGES_DIR / page).read_bytes()) == expected, (
+        f'Проверьте извлечение данных со страницы {page}'
+    )
+
+
+def test_extract_pep_index():
+    pep_index = extractors.extract_pep_index(
+        (PAGES_DIR / 'pep-index.html').read_bytes()
+    )
+    assert len(pep_index) == 667, (
+        'В индекс должны попадать только строки числового индекса PEP'
+    )
+    assert pep_index[1] == ('S', 'R', 'pep-0001/')
+    assert pep_index[8166] == ('S', 'W', 'pep-8166/')
+
+
+def test_extract_pep_index_without_table():
+    with pytest.raises(extractors.ParserFindTagException):
+        extractors.extract_pep_index(PEP_CARD)
+
+
+@pytest.mark.parametrize('processes', [1, 2])
+def test_extract_all(processes):
+    error = ConnectionError('offline')
+    fetched = [
+        ('pep-0008', Page(PEP_CARD), None),
+        ('pep-0009', None, error),
+        ('pep-0010', Page(b'<p>empty</p>'), None),
+        ('pep-0011', Page(b'', status_code=304), None),
+    ]
+    got = list(extractors.extract_all(
+        extractors.extract_pep_card, fetched, processes
+    ))
+    assert [url for url, _, _ in got] == [
+        'pep-0008', 'pep-0009', 'pep-0010', 'pep-0011'
+    ]
+    assert got[0][1][0] == 'Active'
+    assert got[1][1] is None and str(got[1][2]) == 'offline'
+    assert type(got[2][2]).__name__ == 'ParserFindTagException', (
+        'Ошибка разбора страницы должна возвращаться вместе со ссылкой'
+    )
+    assert got[3][1:] == (None, None), (
+        'Неизменившаяся страница (304) не должна разбираться'
+    )
+
+
+@pytest.mark.parametrize('parser', ['lxml', 'html.parser'])
+@pytest.mark.parametrize('page, extractor', [
+    ('pep-0008.html', 'extract_pep_card'),
+    ('pep-0008.html', 'extract_pep_metadata'),
+    ('pep-index.html', 'extract_pep_index'),
+    ('whatsnew-3.11.html', 'extract_whats_new'),
+    ('whatsnew-3.11.html', 'extract_sections'),
+    ('whatsnew-3.11.html', 'extract_whats_new_outline'),
+])
+def test_parsers_match_default(parser, page, extractor):
+    html = (PAGES_DIR / page).read_bytes()
+    expected = getattr(extractors.get_parser(), extractor)(html)
+    got = getattr(extractors.PARSERS[parser], extractor)(html)
+    assert got == expected, (
+        f'Разбор {page} через {parser} должен давать тот же результат'
+    )
+
+
+@pytest.mark.parametrize('parser', ['lxml', 'html.parser'])
+def test_parsers_missing_tag(parser):
+    with pytest.raises(extractors.ParserFindTagException):
+        extractors.PARSERS[parser].extract_pep_card(WHATS_NEW_PAGE)
+    with pytest.raises(extractors.ParserFindTagException):
+        extractors.PARSERS[parser].extract_pep_index(PEP_CARD)
@@ -0,0 +1,161 @@
+import threading
+import time
+
+import requests
+try:
+    from src import fetcher
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `fetcher.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `fetcher.py`'
+
+PEP_LINKS = [
+    f'mock://peps.python.org/pep-{number:04d}/' for number in range(20)
+]
+
+
+class StubSession:
+    """Сессия без сети: отвечает с задержкой и считает запросы к хосту."""
+
+    def __init__(self, broken=()):
+        self.adapters = {}
+        self.broken = set(broken)
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def get(self, url, headers=None):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.01)
+        with self._lock:
+            self.active -= 1
+        if url in self.broken:
+            raise requests.ConnectionError(url)
+        return requests.Response()
+
+
+def test_thread_fetcher_on_stub_session():
+    session = StubSession(broken=[PEP_LINKS[5]])
+    loader = fetcher.ThreadFetcher(session, workers=8, per_host=3)
+    got = list(loader.fetch_all(reversed(PEP_LINKS)))
+    assert [url for url, _, _ in got] == PEP_LINKS[::-1], (
+        'Загрузчик должен возвращать ответы в порядке входных ссылок'
+    )
+    assert session.max_active <= 3, (
+        'Одновременных запросов к хосту должно быть не больше лимита'
+    )
+    errors = {url: error for url, _, error in got if error is not None}
+    assert list(errors) == [PEP_LINKS[5]]
+    assert isinstance(errors[PEP_LINKS[5]], ConnectionError), (
+        'Ошибка загрузки должна возвращаться вместе со ссылкой'
+    )
+
+
+def test_fetch_all_keeps_order(mock_session):
+    got = list(
+        fetcher.ThreadFetcher(mock_session, workers=4).fetch_all(PEP_LINKS)
+    )
+    assert [url for url, _, _ in got] == PEP_LINKS, (
+        'Загрузчик должен возвращать ответы в порядке входных ссылок'
+    )
+    assert all(
+        error is None and response.text == 'You are breathtaken'
+        for _, response, error in got
+    ), 'Загрузчик должен возвращать ответы страниц'
+
+
+def test_fetch_all_reports_errors(mock_session):
+    broken_link = PEP_LINKS[3]
+    mock_session.mock_adapter.register_uri(
+        'GET', broken_link, exc=requests.ConnectTimeout
+    )
+    got = list(
+        fetcher.ThreadFetcher(mock_session, workers=4).fetch_all(PEP_LINKS)
+    )
+    assert isinstance(got[3][2], ConnectionError), (
+        'Ошибка загрузки должна возвращаться вместе со ссылкой'
+    )
+    assert got[3][1] is None
+    assert sum(error is not None for _, _, error in got) == 1
+
+
+def test_fetch_all_streams_results(mock_session):
+    release = threading.Event()
+
+    def slow_page(request, context):
+        release.wait(5)
+        return 'slow'
+
+    mock_session.mock_adapter.register_uri(
+        'GET', PEP_LINKS[-1], text=slow_page
+    )
+    results = fetcher.ThreadFetcher(mock_session, workers=4).fetch_all(
+        PEP_LINKS
+    )
+    start = time.monotonic()
+    first_url, _, _ = next(results)
+    assert first_url == PEP_LINKS[0]
+    assert time.monotonic() - start < 4, (
+        'Загрузчик должен отдавать готовые ответы, не дожидаясь остальных'
+    )
+    release.set()
+    assert len(list(results)) == len(PEP_LINKS) - 1
+
+
+def test_fetch_all_stops_early(mock_session):
+    results = fetcher.ThreadFetcher(mock_session, workers=2).fetch_all(
+        PEP_LINKS
+    )
+    next(results)
+    results.close()
+    assert mock_session.mock_adapter.call_count < len(PEP_LINKS), (
+        'После остановки чтения загрузки не должны продолжаться'
+    )
+
+
+def test_conditional_requests_bypass_cache(mock_session):
+    def card(request, context):
+        if request.headers.get('If-None-Match') == '"v1"':
+            context.status_code = 304
+            return ''
+        context.headers['ETag'] = '"v1"'
+        return 'card'
+
+    for link in PEP_LINKS[:2]:
+        mock_session.mock_adapter.register_uri('GET', link, text=card)
+        mock_session.get(link)
+    got = list(fetcher.ThreadFetcher(mock_session, workers=2).fetch_all(
+        PEP_LINKS[:2], {PEP_LINKS[0]: {'If-None-Match': '"v1"'}}
+    ))
+    assert got[0][1].status_code == 304, (
+        'Условный запрос должен доходить до сервера мимо кеша'
+    )
+    assert got[1][1].from_cache, (
+        'Остальные запросы должны по-прежнему читаться из кеша'
+    )
+    assert mock_session.get(PEP_LINKS[0]).status_code == 200
+
+
+def test_network_adapters_are_throttled(mock_session):
+    loader = fetcher.ThreadFetcher(mock_session, workers=4)
+    adapter = mock_session.get_adapter('https://peps.python.org/')
+    assert isinstance(adapter, fetcher.ThrottledAdapter), (
+        'Запросы в сеть должны проходить через ограничитель темпа'
+    )
+    assert adapter.throttle is loader.throttle
+
+
+def test_fetchers_share_session_throttle(mock_session):
+    first = fetcher.ThreadFetcher(mock_session, workers=2)
+    second = fetcher.ThreadFetcher(mock_session, workers=16)
+    adapter = mock_session.get_adapter('https://peps.python.org/')
+    assert first.throttle is second.throttle is adapter.throttle, (
+        'Все загрузчики сессии должны использовать один ограничитель темпа'
+    )
+    assert adapter._pool_maxsize == 16
+    fetcher.ThreadFetcher(mock_session, workers=2)
+    assert mock_session.get_adapter('https://peps.python.org/') is adapter, (
+        'Адаптер не должен заменяться без необходимости'
+    )
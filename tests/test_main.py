@@ -123,7 +123,10 @@ def test_mode_to_function():
             f'{name_func} - это строка.'
         )
         assert (
-            name_func in ['whats-new', 'latest-versions', 'download', 'pep']
+            name_func in [
+                'whats-new', 'whats-new-outline', 'latest-versions',
+                'download', 'pep', 'pep-metadata', 'index', 'search', 'serve'
+            ]
         ), (
             'В модуле `main.py` в объекте `MODE_TO_FUNCTION` '
             f'нет ключа `{name_func}`'
@@ -134,7 +137,8 @@ def test_mode_to_function():
         )
         assert (
             func.__name__ in [
-                'whats_new', 'latest_versions', 'download', 'pep'
+                'whats_new', 'whats_new_outline', 'latest_versions',
+                'download', 'pep', 'pep_metadata', 'index', 'search', 'serve'
             ]
         ), (
             'В модуле `main.py` в объекте `MODE_TO_FUNCTION` '
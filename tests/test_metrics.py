@@ -0,0 +1,70 @@
+import json
+from argparse import Namespace
+
+import pytest
+from requests_cache import CachedSession
+try:
+    from src import metrics
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `metrics.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `metrics.py`'
+from src import main
+from tests.fixture_data.corpus import mount_corpus
+
+
+@pytest.fixture
+def enabled_metrics(monkeypatch):
+    collector = main.METRICS
+    monkeypatch.setattr(collector, 'enabled', True)
+    monkeypatch.setattr(collector, 'stages', {})
+    return collector
+
+
+def test_stage_stats_percentiles():
+    stats = metrics.StageStats()
+    for seconds in (0.0002, 0.0003, 0.002, 0.2):
+        stats.add(seconds)
+    assert stats.count == 4
+    assert stats.percentile(0.5) == 0.5
+    assert stats.percentile(0.95) == 500
+    assert stats.as_dict()['buckets_ms']['500'] == 1
+
+
+def test_disabled_metrics_record_nothing():
+    collector = metrics.Metrics()
+    collector.record('stage', 1)
+    with collector.timer('stage'):
+        pass
+    assert collector.stages == {}, (
+        'Выключенный сбор метрик не должен ничего записывать'
+    )
+
+
+def test_instrument_keeps_function_name():
+    assert main.pep.__name__ == 'pep', (
+        'Декоратор замера времени должен сохранять имя функции'
+    )
+
+
+def test_whats_new_profile_stages(enabled_metrics, tmp_path, monkeypatch):
+    monkeypatch.setattr(main, 'BASE_DIR', tmp_path)
+    session = mount_corpus(CachedSession(backend='memory'))
+    main.whats_new(session, Namespace(workers=4, processes=1))
+    main.whats_new(session, Namespace(workers=4, processes=1))
+    stages = enabled_metrics.stages
+    for stage in (
+        'mode:whats-new', 'find_tag', metrics.FETCH_NETWORK,
+        metrics.FETCH_CACHE, metrics.PARSE
+    ):
+        assert stage in stages, f'В профиле нет этапа `{stage}`'
+    assert stages['mode:whats-new'].count == 2
+    assert (
+        stages[metrics.FETCH_CACHE].count
+        == stages[metrics.FETCH_NETWORK].count
+    ), 'Повторный запуск должен брать страницы из кэша'
+    path = tmp_path / 'profile.json'
+    enabled_metrics.dump(path)
+    dumped = json.loads(path.read_text(encoding='utf-8'))
+    assert dumped['mode:whats-new']['count'] == 2
+    assert 'mode:whats-new' in enabled_metrics.report()
@@ -0,0 +1,102 @@
+from argparse import Namespace
+from pathlib import Path
+
+import pytest
+import requests
+from requests_cache import CachedSession
+try:
+    from src import mirror
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `mirror.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `mirror.py`'
+from src import main
+from tests.fixture_data.corpus import ARCHIVE_SIZE, mount_corpus
+
+CLI_ARGS = dict(workers=4, processes=1)
+
+
+def run_modes(session, base_dir, monkeypatch):
+    monkeypatch.setattr(main, 'BASE_DIR', base_dir)
+    cli_args = Namespace(**CLI_ARGS)
+    results = (
+        main.whats_new(session, cli_args), main.pep(session, cli_args)
+    )
+    main.download(session, cli_args)
+    archive, = base_dir.glob('downloads/*.zip')
+    return results, archive
+
+
+@pytest.fixture
+def mirror_dir(tmp_path):
+    return Path(tmp_path) / 'mirror'
+
+
+def test_offline_replay_matches_online(mirror_dir, tmp_path, monkeypatch):
+    online_session = mirror.attach_mirror(
+        mount_corpus(CachedSession(backend='memory')),
+        Namespace(mirror_record=True, mirror_dir=mirror_dir)
+    )
+    (tmp_path / 'online').mkdir()
+    online, online_archive = run_modes(
+        online_session, tmp_path / 'online', monkeypatch
+    )
+    offline_session = mirror.attach_mirror(
+        CachedSession(backend='memory'),
+        Namespace(offline=True, mirror_dir=mirror_dir)
+    )
+    (tmp_path / 'offline').mkdir()
+    offline, offline_archive = run_modes(
+        offline_session, tmp_path / 'offline', monkeypatch
+    )
+    assert offline == online, (
+        'Результаты по локальной копии должны совпадать с результатами '
+        'по сети'
+    )
+    assert offline_archive.stat().st_size == ARCHIVE_SIZE
+    assert offline_archive.read_bytes() == online_archive.read_bytes()
+
+
+def test_mirror_skips_unchanged_pages(mirror_dir):
+    page_mirror = mirror.PageMirror.load(mirror_dir)
+    for _ in range(3):
+        page_mirror.add('https://example.com/', b'<p>1</p>', {})
+    page_mirror.add('https://example.com/', b'<p>2</p>', {})
+    assert (mirror_dir / mirror.PACK_FILE).read_bytes() == b'<p>1</p><p>2</p>'
+    with open(mirror_dir / mirror.INDEX_FILE, 'a') as index:
+        index.write('{"u": "обрыв')
+    reloaded = mirror.PageMirror.load(mirror_dir)
+    assert reloaded.get('https://example.com/') == (b'<p>2</p>', {})
+
+
+def test_offline_missing_page(mirror_dir):
+    session = mirror.attach_mirror(
+        requests.Session(), Namespace(offline=True, mirror_dir=mirror_dir)
+    )
+    with pytest.raises(requests.RequestException) as error:
+        session.get('https://example.com/missing')
+    assert not isinstance(error.value, requests.ConnectionError), (
+        'Отсутствие страницы в локальной копии не считается сбоем сети'
+    )
+
+
+def test_offline_range_and_head(mirror_dir):
+    mirror.PageMirror.load(mirror_dir).add(
+        'https://example.com/file', b'0123456789', {'ETag': '"v1"'}
+    )
+    session = mirror.attach_mirror(
+        requests.Session(), Namespace(offline=True, mirror_dir=mirror_dir)
+    )
+    head = session.head('https://example.com/file')
+    assert (head.content, head.headers['Content-Length']) == (b'', '10')
+    assert head.headers['ETag'] == '"v1"'
+    part = session.get(
+        'https://example.com/file', headers={'Range': 'bytes=4-'}
+    )
+    assert part.status_code == 206
+    assert part.content == b'456789'
+    assert part.headers['Content-Range'] == 'bytes 4-9/10'
+    not_modified = session.get(
+        'https://example.com/file', headers={'If-None-Match': '"v1"'}
+    )
+    assert not_modified.status_code == 304
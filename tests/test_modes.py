@@ -0,0 +1,220 @@
+import sys
+import time
+from argparse import Namespace
+from pathlib import Path
+
+import pytest
+from requests_cache import CachedSession
+try:
+    from src import main
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `main.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `main.py`'
+from src import caching
+from tests.fixture_data.corpus import (
+    ARCHIVE_SIZE, MISMATCH_EVERY, mount_corpus, pep_rows
+)
+
+
+@pytest.fixture(autouse=True)
+def base_dir(monkeypatch, tmp_path):
+    # Журналы и результаты режимов не должны попадать в src.
+    monkeypatch.setattr(main, 'BASE_DIR', Path(tmp_path))
+    return Path(tmp_path)
+
+
+@pytest.fixture
+def corpus_session():
+    return mount_corpus(CachedSession(backend='memory'))
+
+
+@pytest.fixture(scope='module')
+def pep_serial(tmp_path_factory):
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(main, 'BASE_DIR', tmp_path_factory.mktemp('serial'))
+        return main.pep(
+            mount_corpus(CachedSession(backend='memory')),
+            Namespace(workers=1, processes=1)
+        )
+
+
+def test_pep_on_corpus(corpus_session, caplog):
+    caplog.set_level('INFO')
+    got = main.pep(corpus_session)
+    cards_count = len(pep_rows()) - 1
+    assert got[0] == ('Статус', 'Количество')
+    assert got[-1] == ('Всего', cards_count)
+    assert sum(count for _, count in got[1:-1]) == cards_count, (
+        'Сумма статусов должна совпадать с количеством карточек PEP'
+    )
+    mismatches = [
+        record for record in caplog.records
+        if 'Несовпадающие статусы' in record.getMessage()
+    ]
+    assert len(mismatches) == cards_count // MISMATCH_EVERY, (
+        'Расхождения статусов карточки и индекса должны попадать в лог'
+    )
+
+
+@pytest.mark.parametrize('cli_args', [
+    Namespace(workers=8, processes=4),
+])
+def test_pep_parallel_matches_serial(corpus_session, pep_serial, cli_args):
+    assert main.pep(corpus_session, cli_args) == pep_serial, (
+        'Параллельная обработка не должна менять результат'
+    )
+
+
+def test_whats_new_on_corpus(corpus_session):
+    got = main.whats_new(corpus_session)
+    assert len(got) == 22
+    assert got[1] == (
+        'https://docs.python.org/3/whatsnew/3.12.html',
+        'What’s New In Python 3.12¶',
+        ' Editor: Pablo Galindo Salgado  ',
+    )
+
+
+def test_whats_new_outline_on_corpus(corpus_session):
+    got = main.whats_new_outline(
+        corpus_session, Namespace(workers=4, processes=1)
+    )
+    assert len(got) == 22
+    link, title, headings, modules, peps = got[1]
+    assert (link, title) == (
+        'https://docs.python.org/3/whatsnew/3.12.html',
+        'What’s New In Python 3.12'
+    )
+    assert headings.split('; ')[:2] == [
+        'Summary – Release highlights', 'New Features'
+    ]
+    assert modules.startswith('asyncio, tomllib')
+    assert '654' in peps.split(', ')
+
+
+def test_latest_versions_on_corpus(corpus_session):
+    got = main.latest_versions(corpus_session)
+    assert got[1] == (
+        'https://docs.python.org/3.13/', '3.13', 'in development'
+    )
+    assert got[-1] == (
+        'https://www.python.org/doc/versions/', 'All versions', ''
+    )
+
+
+def test_download_on_corpus(corpus_session, base_dir):
+    main.download(corpus_session)
+    archive, = base_dir.glob('downloads/*.zip')
+    assert archive.name == 'python-3.12.0-docs-pdf-a4.zip'
+    assert archive.stat().st_size == ARCHIVE_SIZE
+
+
+def test_warm_pep_skips_parsing(corpus_session, pep_serial, monkeypatch):
+    corpus_session.parsed_cache = caching.ParsedCache(':memory:')
+    main.pep(corpus_session, Namespace(workers=4, processes=1))
+
+    def fail(html):
+        raise AssertionError('Разобранные карточки не должны разбираться')
+
+    # Тот же модуль extractors, который импортирует main.
+    from extractors import get_parser
+
+    monkeypatch.setattr(get_parser(), 'extract_pep_card', fail)
+    monkeypatch.setattr(fail, '__name__', 'extract_pep_card')
+    assert main.pep(
+        corpus_session, Namespace(workers=4, processes=1)
+    ) == pep_serial
+    assert corpus_session.parsed_cache.hits == len(pep_rows()) - 1
+
+
+def test_pep_metadata_on_corpus(corpus_session):
+    got = main.pep_metadata(
+        corpus_session, Namespace(workers=4, processes=1)
+    )
+    assert len(got) == len(pep_rows())
+    assert got[0][:4] == ('Номер', 'Заголовок', 'Автор', 'Статус')
+    first = got[1]
+    assert (first.number, first.type, first.created) == (
+        1, 'Process', '05-Jul-2001'
+    )
+    assert len(tuple(first)) == len(got[0])
+    assert all(
+        type(value) in (int, str) for record in got[1:] for value in record
+    ), 'Метаданные PEP не должны ссылаться на дерево разбора'
+    retained = sum(
+        sys.getsizeof(record) + sum(map(sys.getsizeof, record))
+        for record in got[1:]
+    )
+    assert retained < 2 * 1024 * 1024, (
+        'Метаданные всех PEP должны занимать единицы мегабайт'
+    )
+
+
+@pytest.mark.parametrize('parser', ['lxml', 'html.parser'])
+@pytest.mark.parametrize('mode', [
+    'whats_new', 'whats_new_outline', 'latest_versions', 'pep_metadata'
+])
+def test_parsers_match_default(corpus_session, parser, mode):
+    cli_args = Namespace(workers=4, processes=1)
+    expected = getattr(main, mode)(corpus_session, cli_args)
+    cli_args.parser = parser
+    assert getattr(main, mode)(corpus_session, cli_args) == expected, (
+        f'Разбор через {parser} должен давать тот же результат'
+    )
+
+
+def test_get_modes():
+    assert main.get_modes(['pep', 'all', 'pep']) == [
+        'pep', 'whats-new', 'whats-new-outline', 'latest-versions',
+        'download', 'pep-metadata', 'index'
+    ]
+
+
+def test_run_modes_fetch_shared_pages_once(corpus_session, monkeypatch):
+    modes = ['whats-new', 'latest-versions', 'pep', 'pep-metadata']
+    cli_args = Namespace(workers=4, processes=1)
+    expected = [
+        main.run_mode(
+            mount_corpus(CachedSession(backend='memory')), cli_args, mode,
+            collect=True
+        )[0]
+        for mode in modes
+    ]
+    printed = []
+    monkeypatch.setattr(
+        main, 'output_results',
+        lambda results, cli_args: printed.append((cli_args.mode, results))
+    )
+    main.run_modes(corpus_session, cli_args, modes)
+    assert printed == list(zip(modes, expected)), (
+        'Совместный запуск должен выводить те же результаты в порядке режимов'
+    )
+    fetched = [
+        request.url for request in corpus_session.corpus_adapter.request_history
+    ]
+    assert len(fetched) == len(set(fetched)), (
+        'Страницы, нужные нескольким режимам, должны загружаться один раз'
+    )
+
+
+def test_run_modes_download_runs_alone(monkeypatch):
+    running = []
+    overlaps = []
+
+    def fake_mode(name):
+        def mode(session, cli_args=None):
+            running.append(name)
+            time.sleep(0.05)
+            overlaps.append(tuple(running))
+            running.remove(name)
+        return mode
+
+    for name in ('whats-new', 'download', 'pep'):
+        monkeypatch.setitem(main.MODE_TO_FUNCTION, name, fake_mode(name))
+    main.run_modes(CachedSession(backend='memory'), Namespace(), [
+        'whats-new', 'download', 'pep'
+    ])
+    assert ('download',) in overlaps and all(
+        'download' not in seen for seen in overlaps if len(seen) > 1
+    ), 'Загрузка архивов должна выполняться отдельно от других режимов'
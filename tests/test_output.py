@@ -1,3 +1,4 @@
+import json
 from datetime import datetime
 from typing import Optional
 from pathlib import Path
@@ -90,3 +91,44 @@ def test_output_file():
     assert hasattr(outputs, 'file_output'), (
         'Напишите функцию `file_output` в модуле `outputs.py`'
     )
+
+
+@pytest.mark.parametrize('output_format', [None, 'pretty', 'file'])
+def test_control_output_stream(
+    monkeypatch, tmp_path, capsys, records, output_format
+):
+    monkeypatch.setattr(outputs, 'BASE_DIR', Path(tmp_path))
+    rows = records('pep')
+    outputs.control_output(iter(rows), cli_args('pep', output_format))
+    captured_out, _ = capsys.readouterr()
+    if output_format == 'file':
+        output_files = list(Path(tmp_path).glob('**/*.csv'))
+        captured_out = output_files[0].read_text(encoding='utf-8')
+    assert rows[-1][0] in captured_out, (
+        'Функции вывода должны принимать строки результата потоком'
+    )
+
+
+def test_control_output_jsonl(monkeypatch, tmp_path, records):
+    monkeypatch.setattr(outputs, 'BASE_DIR', Path(tmp_path))
+    rows = records('latest-versions')
+    outputs.control_output(rows, cli_args('latest-versions', 'jsonl'))
+    output_file, = Path(tmp_path).glob('results/*.jsonl')
+    lines = output_file.read_text(encoding='utf-8').splitlines()
+    assert len(lines) == len(rows) - 1
+    assert json.loads(lines[0]) == dict(zip(rows[0], rows[1])), (
+        'Каждая строка jsonl должна быть объектом с ключами из заголовка'
+    )
+
+
+def test_control_output_parquet(monkeypatch, tmp_path):
+    parquet = pytest.importorskip('pyarrow.parquet')
+    monkeypatch.setattr(outputs, 'BASE_DIR', Path(tmp_path))
+    rows = [('Статус', 'Количество'), ('Active', 36), ('Всего', 574)]
+    outputs.control_output(iter(rows), cli_args('pep', 'parquet'))
+    output_file, = Path(tmp_path).glob('results/*.parquet')
+    table = parquet.read_table(output_file)
+    assert table.column_names == ['Статус', 'Количество']
+    assert table.column('Количество').to_pylist() == [36, 574], (
+        'Числовые колонки должны сохраняться с числовым типом'
+    )
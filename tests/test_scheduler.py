@@ -0,0 +1,128 @@
+from argparse import Namespace
+
+import pytest
+import requests
+try:
+    from src import scheduler
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `scheduler.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `scheduler.py`'
+from src import fetcher, mirror
+
+PEP_LINKS = [
+    f'mock://peps.python.org/pep-{number:04d}/' for number in range(10)
+]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def make_scheduler(session, retries=3):
+    clock = FakeClock()
+    return scheduler.CrawlScheduler(
+        fetcher.ThreadFetcher(session, workers=4),
+        retries=retries, clock=clock, sleep=clock.sleep
+    ), clock
+
+
+def requests_to(session, url):
+    return sum(
+        request.url == url for request in session.mock_adapter.request_history
+    )
+
+
+def test_crawl_dedupes_and_keeps_order(mock_session):
+    links = [*PEP_LINKS, PEP_LINKS[0], PEP_LINKS[5]]
+    crawler, _ = make_scheduler(mock_session)
+    got = list(crawler.crawl(links))
+    assert [url for url, _, _ in got] == links, (
+        'Планировщик должен возвращать ответы в порядке входных ссылок'
+    )
+    assert requests_to(mock_session, PEP_LINKS[0]) == 1, (
+        'Повторяющиеся ссылки должны загружаться один раз'
+    )
+
+
+def test_crawl_retries_transient_errors(mock_session):
+    broken_link = PEP_LINKS[2]
+    mock_session.mock_adapter.register_uri('GET', broken_link, [
+        {'status_code': 503, 'headers': {'Retry-After': '7'}},
+        {'exc': requests.ConnectTimeout},
+        {'text': 'You are breathtaken'},
+    ])
+    crawler, clock = make_scheduler(mock_session)
+    got = list(crawler.crawl(PEP_LINKS))
+    assert all(error is None for _, _, error in got), (
+        'Временные ошибки должны повторяться'
+    )
+    assert got[2][1].text == 'You are breathtaken'
+    assert requests_to(mock_session, broken_link) == 3
+    assert clock.sleeps[0] >= 7, 'Планировщик должен учитывать Retry-After'
+
+
+def test_crawl_gives_up_after_retries(mock_session):
+    broken_link = PEP_LINKS[4]
+    mock_session.mock_adapter.register_uri(
+        'GET', broken_link, status_code=503
+    )
+    crawler, clock = make_scheduler(mock_session, retries=2)
+    got = list(crawler.crawl(PEP_LINKS))
+    assert isinstance(got[4][2], ConnectionError), (
+        'После исчерпания повторов ссылка должна вернуться с ошибкой'
+    )
+    assert requests_to(mock_session, broken_link) == 3
+    assert clock.sleeps[1] > clock.sleeps[0] / 2, (
+        'Задержка между повторами должна расти'
+    )
+
+
+def test_crawl_fails_permanent_errors_at_once(tmp_path):
+    session = mirror.attach_mirror(
+        requests.Session(), Namespace(offline=True, mirror_dir=tmp_path)
+    )
+    crawler, clock = make_scheduler(session)
+    links = [link.replace('mock://', 'https://') for link in PEP_LINKS[:3]]
+    got = list(crawler.crawl(links))
+    assert all(error is not None for _, _, error in got)
+    assert not clock.sleeps, (
+        'Ошибки, которые не исчезнут при повторе, не должны повторяться'
+    )
+
+
+def test_crawl_respects_retry_budget(mock_session):
+    links = [
+        f'mock://peps.python.org/pep-{number:04d}/' for number in range(200)
+    ]
+    for link in links:
+        mock_session.mock_adapter.register_uri('GET', link, status_code=500)
+    crawler, _ = make_scheduler(mock_session)
+    got = list(crawler.crawl(links))
+    assert all(error is not None for _, _, error in got)
+    assert len(mock_session.mock_adapter.request_history) == 200 + 20, (
+        'Количество повторов должно ограничиваться бюджетом обхода'
+    )
+
+
+def test_host_throttle_spaces_requests():
+    clock = FakeClock()
+    throttle = fetcher.HostThrottle(4, clock=clock, sleep=clock.sleep)
+    for _ in range(3):
+        throttle.wait('https://peps.python.org/pep-0008/')
+    throttle.wait('https://docs.python.org/3/')
+    assert clock.sleeps == [0.25, 0.25], (
+        'Запросы к одному хосту должны идти не чаще заданного темпа'
+    )
+    throttle.delay('https://docs.python.org/3/', 5)
+    throttle.wait('https://docs.python.org/3/whatsnew/')
+    assert clock.sleeps[-1] == pytest.approx(5)
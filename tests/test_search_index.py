@@ -0,0 +1,100 @@
+from argparse import Namespace
+from pathlib import Path
+
+import pytest
+from requests_cache import CachedSession
+try:
+    from src import search_index
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `search_index.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `search_index.py`'
+from src import main
+from tests.fixture_data.corpus import mount_corpus
+
+PEP_8 = (
+    'PEP 8 – Style Guide',
+    (
+        ('introduction', 'Introduction', 'Code is read more often'),
+        ('tabs-or-spaces', 'Tabs or Spaces?', 'Spaces are preferred'),
+    ),
+)
+PEP_20 = (
+    'PEP 20 – The Zen of Python',
+    (('the-zen-of-python', 'The Zen of Python', 'Readability counts'),),
+)
+
+
+def build_index(directory):
+    index = search_index.SearchIndex.load(directory)
+    index.update('https://peps.python.org/pep-0008/', PEP_8)
+    index.update('https://peps.python.org/pep-0020/', PEP_20)
+    index.save()
+    return index
+
+
+def test_find_documents(tmp_path):
+    build_index(tmp_path)
+    assert search_index.find_documents(
+        'spaces', directory=tmp_path
+    ) == [(
+        'https://peps.python.org/pep-0008/#tabs-or-spaces',
+        'PEP 8 – Style Guide › Tabs or Spaces?'
+    )], 'Поиск должен находить раздел страницы по термину'
+    assert len(search_index.find_documents('Python', directory=tmp_path)) == 1
+    assert search_index.find_documents(
+        'spaces readability', directory=tmp_path
+    ) == [], 'Поиск должен возвращать разделы со всеми терминами запроса'
+
+
+def test_find_documents_by_number(tmp_path):
+    index = search_index.SearchIndex.load(tmp_path)
+    index.update('https://docs.python.org/3/whatsnew/3.11.html', (
+        'What’s New In Python 3.11',
+        (('summary', 'Summary', 'PEP 8 style and 3 new modules'),),
+    ))
+    index.save()
+    for query in ('PEP 8', '3'):
+        assert search_index.find_documents(query, directory=tmp_path) == [(
+            'https://docs.python.org/3/whatsnew/3.11.html#summary',
+            'What’s New In Python 3.11 › Summary'
+        )], f'Поиск «{query}» должен находить раздел по числу'
+
+
+def test_index_updates_incrementally(tmp_path):
+    build_index(tmp_path)
+    index = search_index.SearchIndex.load(tmp_path)
+    index.update('https://peps.python.org/pep-0008/', PEP_8)
+    assert index.changed == 0, (
+        'Неизменившиеся страницы не должны переиндексироваться'
+    )
+    index.retain(['https://peps.python.org/pep-0008/'])
+    index.save()
+    assert index.changed == 1
+    assert search_index.find_documents('zen', directory=tmp_path) == [], (
+        'Страницы без ссылок должны удаляться из индекса'
+    )
+
+
+def test_search_without_index(tmp_path):
+    with pytest.raises(search_index.SearchIndexNotFoundError):
+        search_index.find_documents('parser', directory=tmp_path)
+
+
+def test_index_and_search_on_corpus(monkeypatch, tmp_path):
+    monkeypatch.setattr(main, 'BASE_DIR', Path(tmp_path))
+    session = mount_corpus(CachedSession(backend='memory'))
+    cli_args = Namespace(
+        workers=4, processes=1, query='Exception groups', limit=3
+    )
+    got = dict(main.index(session, cli_args)[1:])
+    assert got['Страниц'] == got['Обновлено страниц'] == 688
+    results = main.search(session, cli_args)
+    assert results[0] == ('Ссылка', 'Раздел')
+    assert results[1] == (
+        'https://docs.python.org/3/whatsnew/2.0.html'
+        '#pep-654-exception-groups-and-except',
+        'What’s New In Python 2.0 › Pep 654 Exception Groups And Except'
+    )
+    assert len(results) == 4
+    assert dict(main.index(session, cli_args)[1:])['Обновлено страниц'] == 0
@@ -0,0 +1,107 @@
+import json
+import socket
+import threading
+from argparse import Namespace
+from pathlib import Path
+
+import pytest
+import requests
+from requests_cache import CachedSession
+try:
+    from src import server
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `server.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `server.py`'
+from src import main
+from tests.fixture_data.corpus import mount_corpus
+
+
+class CountingMode:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, session, cli_args=None):
+        self.calls += 1
+        return [('Версия', 'Запуск'), ('3.12', self.calls)]
+
+
+def echo_query(session, cli_args=None):
+    return [('Запрос', 'Лимит'), (cli_args.query, cli_args.limit)]
+
+
+@pytest.fixture(autouse=True)
+def base_dir(monkeypatch, tmp_path):
+    # Журналы и результаты режимов не должны попадать в src.
+    monkeypatch.setattr(main, 'BASE_DIR', Path(tmp_path))
+    return Path(tmp_path)
+
+
+@pytest.fixture
+def running_server():
+    def start(store, cli_args):
+        api = server.create_server(store, cli_args)
+        thread = threading.Thread(target=api.serve_forever, daemon=True)
+        thread.start()
+        servers.append(api)
+        return api
+
+    servers = []
+    yield start
+    for api in servers:
+        api.shutdown()
+        api.server_close()
+
+
+def test_serve_mode_from_memory(running_server):
+    mode = CountingMode()
+    store = server.ResultStore(
+        None, Namespace(limit=20), {'versions': mode}, {'search': echo_query}
+    )
+    api = running_server(store, Namespace(port=0))
+    url = 'http://{}:{}/'.format(*api.server_address)
+    for _ in range(3):
+        got = requests.get(url + 'versions').json()
+    assert got['rows'] == [{'Версия': '3.12', 'Запуск': 1}]
+    assert mode.calls == 1, (
+        'Повторные запросы должны обслуживаться из памяти'
+    )
+    assert requests.get(url).json()['modes'] == {
+        'versions': got['updated']
+    }
+    assert requests.get(url + 'search?q=pep+8&limit=3').json()['rows'] == [
+        {'Запрос': 'pep 8', 'Лимит': 3}
+    ]
+    assert requests.get(url + 'search?limit=0').status_code == 400
+    assert requests.get(url + 'unknown').status_code == 404
+
+
+def test_refresh_replaces_results():
+    mode = CountingMode()
+    store = server.ResultStore(None, None, {'versions': mode})
+    refreshed = threading.Event()
+    store.on_refresh = lambda: mode.calls == 2 and refreshed.set()
+    thread = threading.Thread(target=store.run, args=(0.01,))
+    thread.start()
+    assert refreshed.wait(5)
+    store.stop()
+    thread.join()
+    assert store.get('versions')[1][1][1] >= 2
+
+
+def test_serve_corpus_on_unix_socket(running_server, tmp_path):
+    session = mount_corpus(CachedSession(backend='memory'))
+    expected = main.latest_versions(session)
+    socket_path = Path(tmp_path) / 'api.sock'
+    store = server.ResultStore(
+        session, None, {'latest-versions': main.latest_versions}
+    )
+    running_server(store, Namespace(socket=socket_path))
+    with socket.socket(socket.AF_UNIX) as client:
+        client.connect(str(socket_path))
+        client.sendall(b'GET /latest-versions HTTP/1.0\r\n\r\n')
+        response = b''.join(iter(lambda: client.recv(65536), b''))
+    headers, _, body = response.partition(b'\r\n\r\n')
+    assert headers.startswith(b'HTTP/1.0 200')
+    rows = json.loads(body)['rows']
+    assert [tuple(row.values()) for row in rows] == expected[1:]
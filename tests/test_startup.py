@@ -0,0 +1,60 @@
+import subprocess
+import sys
+from argparse import Namespace
+from pathlib import Path
+
+from requests_cache import CachedSession
+
+from src import main, mirror
+from tests.fixture_data.corpus import mount_corpus
+
+SRC_DIR = Path(__file__).resolve().parent.parent / 'src'
+HEAVY_MODULES = {
+    'requests_cache', 'requests', 'bs4', 'lxml', 'tqdm', 'prettytable',
+    'pyarrow', 'asyncio', 'http.server'
+}
+RUN_LATEST_VERSIONS = """
+import main
+from caching import create_session
+from mirror import attach_mirror
+
+args = main.configure_argument_parser(main.MODE_TO_FUNCTION).parse_args([
+    'latest-versions', '--offline', '--mirror-dir', {mirror_dir!r},
+    '--cache-backend', 'memory', '--no-parsed-cache'
+])
+print(main.latest_versions(attach_mirror(create_session(args), args), args))
+"""
+
+
+def get_imported_modules(*args):
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', *args],
+        cwd=SRC_DIR, capture_output=True, text=True, check=True
+    )
+    return {
+        line.split('|')[-1].strip() for line in completed.stderr.splitlines()
+        if line.startswith('import time:')
+    }
+
+
+def test_help_skips_heavy_imports():
+    imported = get_imported_modules('main.py', '--help')
+    assert 'configs' in imported
+    assert not imported & HEAVY_MODULES, (
+        'Для --help не должны импортироваться зависимости режимов'
+    )
+
+
+def test_mode_imports_only_what_it_uses(tmp_path):
+    mirror_dir = Path(tmp_path) / 'mirror'
+    main.latest_versions(mirror.attach_mirror(
+        mount_corpus(CachedSession(backend='memory')),
+        Namespace(mirror_record=True, mirror_dir=mirror_dir)
+    ))
+    imported = get_imported_modules(
+        '-c', RUN_LATEST_VERSIONS.format(mirror_dir=str(mirror_dir))
+    )
+    assert {'requests_cache', 'bs4'} <= imported
+    assert not imported & {
+        'tqdm', 'prettytable', 'pyarrow', 'asyncio', 'http.server'
+    }, 'Режим latest-versions не должен импортировать лишние зависимости'
@@ -0,0 +1,38 @@
+try:
+    from src import status_index
+except ModuleNotFoundError:
+    assert False, (
+        'Убедитесь что в директории `src` есть файл `status_index.py`'
+    )
+except ImportError:
+    assert False, (
+        'Убедитесь что в директории `src` есть файл `status_index.py`'
+    )
+
+PEP_LINK = 'https://peps.python.org/pep-0008/'
+
+
+class Page:
+    status_code = 200
+    headers = {'ETag': '"abc"', 'Last-Modified': 'Sat, 17 Oct 2026'}
+
+
+def test_status_index_round_trip(tmp_path):
+    index = status_index.PepStatusIndex.load(tmp_path / 'index.json')
+    assert index.conditional_headers([PEP_LINK]) == {}
+    list(index.track([(PEP_LINK, Page(), None)]))
+    index.update(PEP_LINK, 'Active', 'A')
+    index.save()
+
+    loaded = status_index.PepStatusIndex.load(tmp_path / 'index.json')
+    assert loaded.entries['8'] == {
+        'etag': '"abc"',
+        'last_modified': 'Sat, 17 Oct 2026',
+        'status': 'Active',
+        'table_status': 'A',
+    }, 'Индекс должен хранить валидаторы и статусы по номеру PEP'
+    assert loaded.conditional_headers([PEP_LINK]) == {PEP_LINK: {
+        'If-None-Match': '"abc"',
+        'If-Modified-Since': 'Sat, 17 Oct 2026',
+    }}, 'Для известных карточек нужны условные заголовки запроса'
+    assert loaded.get_status(PEP_LINK) == 'Active'
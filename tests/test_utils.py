@@ -1,3 +1,7 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 import requests
 import requests_mock
@@ -54,3 +58,75 @@ def test_get_response(mock_session):
             'делает запрос к странице и возвращает ответ. \n'
             'Кстати: You are breathtaken!'
         )
+
+
+def test_single_flight_shares_running_call():
+    flight = utils.SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def fetch(url):
+        calls.append(url)
+        started.set()
+        release.wait(5)
+        return url.upper()
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        first = executor.submit(flight.do, 'a', fetch, 'a')
+        started.wait(5)
+        others = [executor.submit(flight.do, 'a', fetch, 'a') for _ in range(3)]
+        while flight.shared < 3:
+            time.sleep(0.01)
+        release.set()
+        results = [future.result() for future in (first, *others)]
+    assert results == ['A'] * 4
+    assert calls == ['a'], (
+        'Одновременные вызовы с одним ключом должны выполняться один раз'
+    )
+    assert flight.do('a', fetch, 'a') == 'A' and len(calls) == 2, (
+        'Ключ освобождается после вызова'
+    )
+
+
+def test_soup_cache_evicts_least_recently_used():
+    cache = utils.SoupCache(max_size=10)
+    calls = []
+
+    def parse(page):
+        calls.append(page)
+        return page.upper()
+
+    keys = [cache.get_key(url, 'lxml', url.encode()) for url in 'abc']
+    for key, url in zip(keys, 'abc'):
+        cache.get(key, 4, parse, url)
+    assert cache.get(keys[2], 4, parse, 'c') == 'C'
+    assert cache.get(keys[1], 4, parse, 'b') == 'B'
+    assert cache.get(keys[0], 4, parse, 'a') == 'A'
+    assert calls == ['a', 'b', 'c', 'a'], (
+        'При превышении размера вытесняется давно не использованная запись'
+    )
+    assert (cache.hits, cache.misses, cache.evicted) == (2, 4, 2)
+    assert cache.hit_rate == 2 / 6
+    assert cache.size <= cache.max_size
+    cache.get(cache.get_key('huge', 'lxml', b''), 11, parse, 'huge')
+    assert cache.get(cache.get_key('huge', 'lxml', b''), 11, parse, 'huge')
+    assert calls[-2:] == ['huge', 'huge'], (
+        'Запись больше лимита не должна храниться'
+    )
+    assert cache.get_key('a', 'lxml', b'1') != cache.get_key('a', 'lxml', b'2')
+
+
+def test_create_soup_reuses_parsed_page(mock_session, monkeypatch):
+    monkeypatch.setattr(utils, 'SOUP_CACHE', utils.SoupCache())
+    parsed = []
+    parse_soup = utils.parse_soup
+    monkeypatch.setattr(
+        utils, 'parse_soup',
+        lambda *args: parsed.append(args) or parse_soup(*args)
+    )
+    first = utils.create_soup(mock_session, 'mock://pep.test/')
+    second = utils.create_soup(mock_session, 'mock://pep.test/')
+    assert first is second and len(parsed) == 1, (
+        'Неизменившаяся страница должна разбираться один раз'
+    )